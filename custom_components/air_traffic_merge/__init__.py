@@ -1,19 +1,125 @@
 from __future__ import annotations
 
+import os
+import sys
+import time
+
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
+from . import websocket_api
+from .aircraft_view import AirTrafficAircraftView
 from .const import DOMAIN
+from .coverage import Coverage, async_remove_coverage
+from .data import ENTRIES_KEY, EntryData, async_entries_data
+from .sightings import SightingLog
+from .source import async_release_sources
+from .state_cache import async_remove_cache
 
 PLATFORMS: list[str] = ["sensor", "binary_sensor"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+SERVICE_EXPORT_SIGHTINGS = "export_sightings"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_FILENAME = "filename"
+
+EXPORT_SIGHTINGS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Optional(ATTR_FILENAME): str,
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    websocket_api.async_register(hass)
+    hass.http.register_view(AirTrafficAircraftView())
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    hass.data.setdefault(DOMAIN, {})
+    t0 = time.perf_counter()
+
+    coverage = Coverage(hass, entry.entry_id)
+    await coverage.async_load()
+    sightings = SightingLog(hass, hass.config.path(DOMAIN, f"sightings_{entry.entry_id}.db"))
+    sightings.async_start()
+    data = EntryData(sightings=sightings, coverage=coverage)
+    hass.data.setdefault(DOMAIN, {}).setdefault(ENTRIES_KEY, {})[entry.entry_id] = data
+
+    if not hass.services.has_service(DOMAIN, SERVICE_EXPORT_SIGHTINGS):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_EXPORT_SIGHTINGS,
+            _async_export_sightings,
+            schema=EXPORT_SIGHTINGS_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # the first fetch runs in the background, see diagnostics for its duration
+    data.setup_s = round(time.perf_counter() - t0, 3)
     return True
 
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if ok:
-        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        entries = async_entries_data(hass)
+        data = entries.pop(entry.entry_id, None)
+        if data is not None:
+            await data.sightings.async_stop()
+            await data.coverage.async_flush()
+        async_release_sources(hass, entry.entry_id)
+        if not entries:
+            # last entry gone: release what the entries share
+            hass.services.async_remove(DOMAIN, SERVICE_EXPORT_SIGHTINGS)
+            # optional modules are imported on first use, only release what was loaded
+            if (aircraft_db := sys.modules.get(f"{__name__}.aircraft_db")) is not None:
+                aircraft_db.async_close_aircraft_dbs(hass)
+            if (airlines := sys.modules.get(f"{__name__}.airlines")) is not None:
+                airlines.async_release_enrichers(hass)
+            if (worker := sys.modules.get(f"{__name__}.worker")) is not None:
+                await worker.async_release_worker(hass)
     return ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await async_remove_cache(hass, entry.entry_id)
+    await async_remove_coverage(hass, entry.entry_id)
+
+
+async def _async_export_sightings(call: ServiceCall) -> ServiceResponse:
+    """Export the sighting log of one or all entries to CSV files below /config."""
+    hass = call.hass
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    filename = call.data.get(ATTR_FILENAME)
+
+    logs = {
+        eid: data.sightings
+        for eid, data in async_entries_data(hass).items()
+        if not entry_id or eid == entry_id
+    }
+    if not logs:
+        raise HomeAssistantError(
+            f"Entry {entry_id} is not loaded" if entry_id else "No air_traffic_merge entry loaded"
+        )
+
+    exported = []
+    for eid, log in logs.items():
+        if filename and len(logs) == 1:
+            path = filename if os.path.isabs(filename) else hass.config.path(filename)
+        else:
+            path = hass.config.path(DOMAIN, f"sightings_{eid}.csv")
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Path {path} is not allowed")
+        rows = await log.async_export_csv(path)
+        exported.append({"config_entry_id": eid, "path": path, "rows": rows})
+
+    return {"exported": exported}
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import gzip
+import hashlib
+import io
+import logging
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DB_KEY = "aircraft_db"
+LOOKUP_CACHE_SIZE = 4096
+# Seconds between checks whether the database file changed (or a failed load can be retried)
+RELOAD_CHECK_INTERVAL = 60
+
+# File layout: header, sorted index (icao, blob offset, blob length), string blob.
+# Blob entries are "reg\x1ftype\x1fdesc\x1fownop\x1fflags" in UTF-8.
+_MAGIC = b"ATMDB1"
+_HEADER = struct.Struct("<6sI")
+_INDEX = struct.Struct("<IIH")
+_SEP = "\x1f"
+_KEYS = ("r", "t", "desc", "ownOp")
+
+
+def _open_text(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", errors="replace", newline="")
+    return open(path, encoding="utf-8", errors="replace", newline="")
+
+
+def compile_csv(csv_path: str, db_path: str) -> int:
+    """Compile a tar1090-db style CSV (icao;reg;type;flags;desc;year;ownop) into the binary format.
+
+    Blocking, run in an executor. Returns the number of records written.
+    """
+    records: list[tuple[int, bytes]] = []
+    with _open_text(csv_path) as fh:
+        first = fh.readline()
+        delimiter = ";" if first.count(";") >= first.count(",") else ","
+        fh.seek(0)
+        for row in csv.reader(fh, delimiter=delimiter):
+            if not row:
+                continue
+            try:
+                icao = int(row[0].strip(), 16)
+            except ValueError:
+                # header or garbage line
+                continue
+            cols = [c.strip().replace(_SEP, " ") for c in row[1:7]] + [""] * 6
+            reg, typ, flags, desc, _year, ownop = cols[:6]
+            blob = _SEP.join((reg, typ, desc, ownop, flags)).encode("utf-8")[:0xFFFF]
+            records.append((icao, blob))
+
+    records.sort(key=lambda r: r[0])
+
+    tmp = f"{db_path}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(_HEADER.pack(_MAGIC, len(records)))
+        offset = 0
+        for icao, blob in records:
+            out.write(_INDEX.pack(icao, offset, len(blob)))
+            offset += len(blob)
+        for _icao, blob in records:
+            out.write(blob)
+    os.replace(tmp, db_path)
+    return len(records)
+
+
+def _parse_flags(s: str) -> int:
+    """tar1090-db flag string ("1000" = military, "0100" = interesting, ...) -> readsb dbFlags."""
+    if s and set(s) <= {"0", "1"}:
+        return sum(1 << i for i, c in enumerate(s) if c == "1")
+    try:
+        return int(s)
+    except ValueError:
+        return 0
+
+
+class AircraftDb:
+    """Read-only, memory-mapped aircraft database, binary-searched by ICAO hex."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._count = _HEADER.unpack_from(self._mm, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not an aircraft database")
+        except Exception:
+            self._fh.close()
+            raise
+        self._blob_start = _HEADER.size + self._count * _INDEX.size
+        self.lookup = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mm.close()
+        self._fh.close()
+
+    def _lookup(self, hx: str) -> Optional[dict[str, Any]]:
+        try:
+            hx = hx.strip()
+            if hx.startswith("~"):
+                # non-ICAO (TIS-B/anonymous) address, the same digits belong to another aircraft
+                return None
+            icao = int(hx, 16)
+        except (AttributeError, ValueError):
+            return None
+
+        mm = self._mm
+        lo, hi = 0, self._count - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            key, offset, length = _INDEX.unpack_from(mm, _HEADER.size + mid * _INDEX.size)
+            if key < icao:
+                lo = mid + 1
+            elif key > icao:
+                hi = mid - 1
+            else:
+                start = self._blob_start + offset
+                parts = mm[start:start + length].decode("utf-8", errors="replace").split(_SEP)
+                info: dict[str, Any] = {k: v for k, v in zip(_KEYS, parts) if v}
+                flags = _parse_flags(parts[4] if len(parts) > 4 else "")
+                if flags:
+                    info["dbFlags"] = flags
+                return info
+        return None
+
+
+def load_aircraft_db(source: str, cache_dir: str) -> AircraftDb:
+    """Open `source` as a compiled database, compiling it first if it is a CSV.
+
+    Blocking, run in an executor. The compiled file is rebuilt when the CSV is newer.
+    """
+    with open(source, "rb") as fh:
+        if fh.read(len(_MAGIC)) == _MAGIC:
+            return AircraftDb(source)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    digest = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:10]
+    db_path = os.path.join(cache_dir, f"aircraft_{digest}.bin")
+    if not os.path.exists(db_path) or os.path.getmtime(db_path) < os.path.getmtime(source):
+        count = compile_csv(source, db_path)
+        _LOGGER.info("Compiled aircraft database %s (%d aircraft) to %s", source, count, db_path)
+    return AircraftDb(db_path)
+
+
+def _load_or_none(source: str, cache_dir: str) -> AircraftDb | None:
+    try:
+        return load_aircraft_db(source, cache_dir)
+    except Exception as err:
+        _LOGGER.warning("Aircraft database %s not usable: %s", source, err)
+        return None
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+@dataclass
+class _OpenDb:
+    mtime: Optional[float]
+    future: asyncio.Future
+    checked: float
+
+
+def _close_when_done(fut: asyncio.Future) -> None:
+    def _close(f: asyncio.Future) -> None:
+        if not f.cancelled() and f.exception() is None and f.result() is not None:
+            f.result().close()
+
+    fut.add_done_callback(_close)
+
+
+async def async_get_aircraft_db(hass: HomeAssistant, source: str) -> AircraftDb | None:
+    """Shared database per source path, reopened when the file changes.
+
+    A failed load is retried on the next check, so fixing the file does not need a restart.
+    """
+    if not source:
+        return None
+    path = source if os.path.isabs(source) else hass.config.path(source)
+    dbs: dict[str, _OpenDb] = hass.data.setdefault(DOMAIN, {}).setdefault(DB_KEY, {})
+    cached = dbs.get(path)
+    if cached is None or time.monotonic() - cached.checked >= RELOAD_CHECK_INTERVAL:
+        mtime = await hass.async_add_executor_job(_mtime, path)
+        cached = dbs.get(path)
+        if cached is not None and cached.mtime == mtime:
+            cached.checked = time.monotonic()
+        else:
+            if cached is not None:
+                _close_when_done(cached.future)
+            cached = dbs[path] = _OpenDb(
+                mtime,
+                hass.async_add_executor_job(_load_or_none, path, hass.config.path(DOMAIN)),
+                time.monotonic(),
+            )
+    db = await cached.future
+    if db is None:
+        # forget the mtime: the next check loads again
+        cached.mtime = None
+    return db
+
+
+def async_close_aircraft_dbs(hass: HomeAssistant) -> None:
+    """Close all open databases (last entry unloaded)."""
+    for cached in (hass.data.get(DOMAIN, {}).pop(DB_KEY, None) or {}).values():
+        _close_when_done(cached.future)
+
+
+def enrich_aircraft(db: AircraftDb, aircraft: list[dict]) -> list[dict]:
+    """Aircraft list with missing r/t/desc/ownOp/dbFlags filled in.
+
+    The input is left untouched (it may be a snapshot shared between entries);
+    enriched aircraft are shallow copies.
+    """
+    out: list[dict] = []
+    for ac in aircraft or []:
+        if isinstance(ac, dict) and not (ac.get("r") and ac.get("t") and ac.get("ownOp")):
+            info = db.lookup((ac.get("hex") or "").lower())
+            if info:
+                missing = {k: v for k, v in info.items() if not ac.get(k)}
+                if missing:
+                    ac = {**ac, **missing}
+        out.append(ac)
+    return out
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import gzip
+import json
+import secrets
+from http import HTTPStatus
+from typing import Any, Optional
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .data import EntryData, async_get_entry_data
+
+# Part of every ETag: generations restart from the saved cache after a reboot,
+# so the same generation number can stand for different content
+_BOOT_ID = secrets.token_hex(4)
+
+# Flight fields added to the readsb aircraft objects
+_EXTRA_FIELDS = ("airline", "route", "source", "tracked", "tracked_target", "trail", "alerts")
+
+
+def build_aircraft_json(store: dict[str, Any]) -> dict[str, Any]:
+    """Merged, enriched flight table in readsb aircraft.json format."""
+    flights_by_hex = {f["hex"]: f for f in store.get("flights", []) or [] if f.get("hex")}
+    aircraft = []
+    for ac in store.get("aircraft", []) or []:
+        if not isinstance(ac, dict):
+            continue
+        f = flights_by_hex.get(ac.get("hex"))
+        if f is None:
+            aircraft.append(ac)
+            continue
+        out = dict(ac)
+        for key in _EXTRA_FIELDS:
+            if f.get(key) not in (None, ""):
+                out[key] = f[key]
+        aircraft.append(out)
+
+    raw = store.get("raw", {}) or {}
+    return {
+        "now": raw.get("now") or store.get("last_update"),
+        "messages": raw.get("messages"),
+        "aircraft": aircraft,
+    }
+
+
+def _serialize(store: dict[str, Any]) -> tuple[bytes, bytes]:
+    body = json.dumps(build_aircraft_json(store), separators=(",", ":")).encode("utf-8")
+    return body, gzip.compress(body, compresslevel=6)
+
+
+class AirTrafficAircraftView(HomeAssistantView):
+    """Serves the merged flight table of an entry as aircraft.json.
+
+    The response is serialized once per update (generation) and shared by all
+    clients, with ETag/If-None-Match and gzip support. The serialized body is
+    kept in the entry's runtime data, so it goes away with the entry.
+    """
+
+    url = "/api/air_traffic_merge/{entry_id}/aircraft.json"
+    name = "api:air_traffic_merge:aircraft"
+
+    async def _async_body(self, hass: HomeAssistant, data: EntryData, store: dict[str, Any], generation: int) -> tuple[bytes, bytes]:
+        cached = data.aircraft_json
+        if cached is None or cached[0] != generation:
+            fut = hass.async_add_executor_job(_serialize, store)
+            cached = data.aircraft_json = (generation, fut)
+        try:
+            return await cached[1]
+        except Exception:
+            # don't serve a failed serialization to later requests
+            if data.aircraft_json is cached:
+                data.aircraft_json = None
+            raise
+
+    async def get(self, request: web.Request, entry_id: str) -> web.Response:
+        hass: HomeAssistant = request.app["hass"]
+        data = async_get_entry_data(hass, entry_id)
+        store: Optional[dict] = data.latest if data is not None else None
+        if not store:
+            return self.json_message("No data for this entry", HTTPStatus.NOT_FOUND)
+        if store.get("restored"):
+            # the saved cache has no raw aircraft, wait for the first poll
+            return self.json_message(
+                "No data for this entry yet", HTTPStatus.SERVICE_UNAVAILABLE, headers={"Retry-After": "10"}
+            )
+
+        generation = int(store.get("generation", 0))
+        etag = f'"{entry_id[:8]}-{_BOOT_ID}-{generation}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        body, gz = await self._async_body(hass, data, store, generation)
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            body = gz
+        return web.Response(body=body, content_type="application/json", headers=headers)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+ENRICHER_KEY = "callsign_enricher"
+AIRLINES_FILE = os.path.join(os.path.dirname(__file__), "airlines.csv")
+
+CACHE_SIZE = 2048
+CACHE_TTL = 3600
+# Seconds between checks whether the route file changed
+RELOAD_CHECK_INTERVAL = 60
+
+_EMPTY: Mapping[str, str] = MappingProxyType({})
+
+
+def airline_prefix(callsign: str) -> str:
+    """ICAO airline designator of a callsign ("DLH4AB" -> "DLH"), "" for registrations etc."""
+    cs = (callsign or "").strip().upper()
+    if len(cs) > 3 and cs[:3].isalpha() and cs[3].isdigit():
+        return cs[:3]
+    return ""
+
+
+def load_airlines(path: str = AIRLINES_FILE) -> Mapping[str, str]:
+    """ICAO designator -> airline name (blocking, run in an executor)."""
+    table: dict[str, str] = {}
+    with open(path, encoding="utf-8", newline="") as fh:
+        for row in csv.reader(fh, delimiter=";"):
+            if len(row) < 2 or row[0] == "icao":
+                continue
+            table[row[0].strip().upper()] = row[1].strip()
+    return MappingProxyType(table)
+
+
+def load_routes(path: str) -> Mapping[str, str]:
+    """Callsign -> route ("EDDF-KJFK") from a local CSV (blocking, run in an executor).
+
+    Accepts `callsign,route` lines or a file with a header containing
+    `Callsign` and `AirportCodes` (vrs standing-data routes.csv).
+    """
+    routes: dict[str, str] = {}
+    with open(path, encoding="utf-8", errors="replace", newline="") as fh:
+        first = fh.readline()
+        delimiter = ";" if first.count(";") > first.count(",") else ","
+        header = [h.strip().lower() for h in first.split(delimiter)]
+        if "callsign" in header:
+            cs_idx = header.index("callsign")
+            route_idx = header.index("airportcodes") if "airportcodes" in header else header.index("route")
+        else:
+            cs_idx, route_idx = 0, 1
+            fh.seek(0)
+        for row in csv.reader(fh, delimiter=delimiter):
+            if len(row) <= max(cs_idx, route_idx):
+                continue
+            cs = row[cs_idx].strip().upper()
+            route = row[route_idx].strip().upper()
+            if cs and route:
+                routes[cs] = route
+    return MappingProxyType(routes)
+
+
+class _TTLCache:
+    """Small LRU cache with per-entry expiry."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, now: float) -> Optional[Any]:
+        hit = self._data.get(key)
+        if hit is None:
+            return None
+        if hit[0] < now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return hit[1]
+
+    def put(self, key: str, value: Any, now: float) -> None:
+        self._data[key] = (now + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+
+class CallsignEnricher:
+    """Airline name and route per callsign, cached with a TTL."""
+
+    def __init__(self, airlines: Mapping[str, str], routes: Mapping[str, str] = _EMPTY) -> None:
+        self._airlines = airlines
+        self._routes = routes
+        self._cache = _TTLCache()
+
+    def lookup(self, callsign: str) -> Mapping[str, str]:
+        cs = (callsign or "").strip().upper()
+        if not cs:
+            return _EMPTY
+        now = time.monotonic()
+        hit = self._cache.get(cs, now)
+        if hit is not None:
+            return hit
+
+        info: dict[str, str] = {}
+        airline = self._airlines.get(airline_prefix(cs))
+        if airline:
+            info["airline"] = airline
+        route = self._routes.get(cs)
+        if route:
+            info["route"] = route
+
+        result = MappingProxyType(info) if info else _EMPTY
+        self._cache.put(cs, result, now)
+        return result
+
+
+def _load_enricher(route_file: str) -> CallsignEnricher:
+    airlines = load_airlines()
+    routes: Mapping[str, str] = _EMPTY
+    if route_file:
+        try:
+            routes = load_routes(route_file)
+        except Exception as err:
+            _LOGGER.warning("Route file %s not usable: %s", route_file, err)
+    return CallsignEnricher(airlines, routes)
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+@dataclass
+class _LoadedEnricher:
+    mtime: Optional[float]
+    future: asyncio.Future
+    checked: float
+
+
+async def async_get_enricher(hass: HomeAssistant, route_file: str = "") -> CallsignEnricher:
+    """Shared enricher per route file, reloaded when the file changes.
+
+    Tables are loaded in an executor on first use and after a change.
+    """
+    path = route_file if not route_file or os.path.isabs(route_file) else hass.config.path(route_file)
+    enrichers: dict[str, _LoadedEnricher] = hass.data.setdefault(DOMAIN, {}).setdefault(ENRICHER_KEY, {})
+    cached = enrichers.get(path)
+    if cached is None or time.monotonic() - cached.checked >= RELOAD_CHECK_INTERVAL:
+        mtime = await hass.async_add_executor_job(_mtime, path)
+        cached = enrichers.get(path)
+        if cached is not None and cached.mtime == mtime:
+            cached.checked = time.monotonic()
+        else:
+            cached = enrichers[path] = _LoadedEnricher(
+                mtime, hass.async_add_executor_job(_load_enricher, path), time.monotonic()
+            )
+    return await cached.future
+
+
+def async_release_enrichers(hass: HomeAssistant) -> None:
+    """Drop the shared enrichers (last entry unloaded)."""
+    hass.data.get(DOMAIN, {}).pop(ENRICHER_KEY, None)
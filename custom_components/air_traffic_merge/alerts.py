@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from typing import Any, Callable, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CONF_ALERT_DESCENT_FPM,
+    CONF_ALERT_HEX_RANGES,
+    CONF_ALERT_MILITARY,
+    CONF_ALERT_SQUAWKS,
+    DEFAULT_ALERT_DESCENT_FPM,
+    DEFAULT_ALERT_HEX_RANGES,
+    DEFAULT_ALERT_MILITARY,
+    DEFAULT_ALERT_SQUAWKS,
+    EVENT_ALERT,
+)
+from .geo import num
+
+# An alert for a hex/rule fires again only after it was clear for this long
+ALERT_RESET = 300
+
+# readsb dbFlags bit for military aircraft
+DBFLAG_MILITARY = 1
+
+_SQUAWK_NAMES = {"7500": "hijack", "7600": "radio_failure", "7700": "emergency"}
+_SQUAWK_RE = re.compile(r"[0-7]{4}")
+
+# (rule, detail) of a match
+Match = tuple[str, str]
+
+
+def parse_squawks(value: str) -> list[str]:
+    """`7700, 7600` -> squawk codes (4 octal digits each); raises ValueError."""
+    codes = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not _SQUAWK_RE.fullmatch(part):
+            raise ValueError(part)
+        codes.append(part)
+    return codes
+
+
+def parse_hex_ranges(value: str) -> list[tuple[int, int]]:
+    """`3f0000-3fffff,ae1234` -> sorted, merged (start, end) ranges; raises ValueError."""
+    ranges = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        start = int(lo.strip(), 16)
+        end = int(hi.strip(), 16) if hi.strip() else start
+        if end < start:
+            raise ValueError(part)
+        ranges.append((start, end))
+    ranges.sort()
+    merged: list[tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class AlertEngine:
+    """Squawk, descent rate, military flag and hex range rules over the raw aircraft table.
+
+    Rules are compiled from the options into a table field -> check, so a poll
+    is a single pass that only looks at the fields some rule needs.
+    Each hex/rule pair fires `air_traffic_merge_alert` once until it has been
+    clear for ALERT_RESET seconds.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self.hass = hass
+        self.entry = entry
+        self._compiled_from: Optional[tuple] = None
+        self._checks: dict[str, Callable[[Any], Optional[Match]]] = {}
+        self._active: dict[tuple[str, str], float] = {}
+
+    def _opt(self, key: str, default: Any) -> Any:
+        return self.entry.options.get(key, self.entry.data.get(key, default))
+
+    def _compile(self) -> None:
+        source = (
+            self._opt(CONF_ALERT_SQUAWKS, DEFAULT_ALERT_SQUAWKS),
+            int(self._opt(CONF_ALERT_DESCENT_FPM, DEFAULT_ALERT_DESCENT_FPM)),
+            bool(self._opt(CONF_ALERT_MILITARY, DEFAULT_ALERT_MILITARY)),
+            self._opt(CONF_ALERT_HEX_RANGES, DEFAULT_ALERT_HEX_RANGES),
+        )
+        if source == self._compiled_from:
+            return
+        self._compiled_from = source
+        squawks_opt, descent_fpm, military, hex_ranges = source
+        checks: dict[str, Callable[[Any], Optional[Match]]] = {}
+
+        try:
+            squawks = {c: _SQUAWK_NAMES.get(c, "squawk") for c in parse_squawks(squawks_opt)}
+        except ValueError:
+            squawks = {}
+        if squawks:
+            def _squawk(v: Any) -> Optional[Match]:
+                name = squawks.get(v)
+                return (f"squawk_{v}", name) if name else None
+            checks["squawk"] = _squawk
+
+        if descent_fpm > 0:
+            limit = -float(descent_fpm)
+
+            def _descent(v: Any) -> Optional[Match]:
+                rate = num(v)
+                return ("descent", f"{int(rate)} ft/min") if rate is not None and rate <= limit else None
+            checks["baro_rate"] = _descent
+
+        if military:
+            def _military(v: Any) -> Optional[Match]:
+                return ("military", "dbFlags") if isinstance(v, int) and v & DBFLAG_MILITARY else None
+            checks["dbFlags"] = _military
+
+        try:
+            ranges = parse_hex_ranges(hex_ranges)
+        except ValueError:
+            ranges = []
+        if ranges:
+            starts = [r[0] for r in ranges]
+
+            def _hex(v: Any) -> Optional[Match]:
+                try:
+                    addr = int(v, 16)
+                except (TypeError, ValueError):
+                    # "~..." non-ICAO addresses
+                    return None
+                i = bisect_right(starts, addr) - 1
+                return ("hex_range", f"{ranges[i][0]:06x}-{ranges[i][1]:06x}") if i >= 0 and addr <= ranges[i][1] else None
+            checks["hex"] = _hex
+
+        self._checks = checks
+
+    @callback
+    def evaluate(self, aircraft: list[dict], now: float) -> dict[str, list[Match]]:
+        """Matches per hex for this poll; fires events for new ones."""
+        self._compile()
+        if not self._checks:
+            self._active.clear()
+            return {}
+
+        checks = tuple(self._checks.items())
+        matches: dict[str, list[Match]] = {}
+        for ac in aircraft:
+            if not isinstance(ac, dict):
+                continue
+            hits = None
+            for key, check in checks:
+                v = ac.get(key)
+                if v is None:
+                    continue
+                m = check(v)
+                if m is not None:
+                    if hits is None:
+                        hits = []
+                    hits.append(m)
+            if hits is None:
+                continue
+            hx = (ac.get("hex") or "").strip().lower()
+            matches[hx] = hits
+            for rule, detail in hits:
+                if (hx, rule) not in self._active:
+                    self._fire(ac, hx, rule, detail, now)
+                self._active[(hx, rule)] = now
+
+        expired = [k for k, ts in self._active.items() if now - ts > ALERT_RESET]
+        for k in expired:
+            del self._active[k]
+        return matches
+
+    def _fire(self, ac: dict, hx: str, rule: str, detail: str, now: float) -> None:
+        self.hass.bus.async_fire(
+            EVENT_ALERT,
+            {
+                "rule": rule,
+                "detail": detail,
+                "hex": hx,
+                "callsign": (ac.get("flight") or "").strip(),
+                "registration": (ac.get("r") or "").strip(),
+                "squawk": ac.get("squawk"),
+                "baro_rate": ac.get("baro_rate"),
+                "alt_baro": ac.get("alt_baro"),
+                "lat": ac.get("lat"),
+                "lon": ac.get("lon"),
+                "r_dst": ac.get("r_dst"),
+                "last_update": int(now),
+            },
+        )
@@ -1,19 +1,53 @@
 from __future__ import annotations
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.restore_state import RestoreEntity
 
-from .const import DOMAIN
+from .const import SIGNAL_TARGET_UPDATED
+from .data import async_get_entry_data, restored_attributes
+from .pipeline import tracking_targets
 
-STORE_KEY = "latest"
+
+def _sanitize_id(s: str) -> str:
+    # for unique_id / entity ids
+    return "".join(ch.lower() if ch.isalnum() else "_" for ch in s).strip("_")
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> None:
     async_add_entities([AirTrafficTrackedPresentBinarySensor(hass, entry)])
 
+    # One entity per configured target, added/removed when the options change
+    targets: dict[str, AirTrafficTargetBinarySensor] = {}
+
+    @callback
+    def _sync_targets() -> None:
+        wanted = tracking_targets(entry)
+        registry = er.async_get(hass)
+        for target in [t for t in targets if t not in wanted]:
+            ent = targets.pop(target)
+            if ent.entity_id and registry.async_get(ent.entity_id):
+                registry.async_remove(ent.entity_id)
+            else:
+                hass.async_create_task(ent.async_remove())
+
+        new = [AirTrafficTargetBinarySensor(hass, entry, t) for t in wanted if t not in targets]
+        for ent in new:
+            targets[ent.target] = ent
+        if new:
+            async_add_entities(new)
+
+    async def _options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        _sync_targets()
+
+    _sync_targets()
+    entry.async_on_unload(entry.add_update_listener(_options_updated))
 
-class AirTrafficTrackedPresentBinarySensor(BinarySensorEntity):
+
+class AirTrafficTrackedPresentBinarySensor(RestoreEntity, BinarySensorEntity):
     _attr_name = "Air Traffic Tracked Present"
     _attr_icon = "mdi:radar"
 
@@ -24,8 +58,18 @@ class AirTrafficTrackedPresentBinarySensor(BinarySensorEntity):
         self._attr_is_on = False
         self._attr_extra_state_attributes = {}
 
+    async def async_added_to_hass(self) -> None:
+        last = await self.async_get_last_state()
+        if last is not None:
+            self._attr_is_on = last.state == "on"
+            self._attr_extra_state_attributes = restored_attributes(last)
+
     async def async_update(self):
-        store = self.hass.data.get(DOMAIN, {}).get(self.entry.entry_id, {}).get(STORE_KEY, {})
+        data = async_get_entry_data(self.hass, self.entry.entry_id)
+        store = data.latest if data is not None else {}
+        if "tracking" not in store:
+            # no refresh yet, keep the restored state
+            return
         tracking = store.get("tracking", {}) or {}
         matched = tracking.get("matched", []) or []
 
@@ -34,4 +78,50 @@ class AirTrafficTrackedPresentBinarySensor(BinarySensorEntity):
             "tracking_enabled": tracking.get("enabled", False),
             "matched_callsigns": tracking.get("matched_callsigns", []),
             "matched_registrations": tracking.get("matched_registrations", []),
+            "approaches": tracking.get("approaches", []),
         }
+
+
+class AirTrafficTargetBinarySensor(RestoreEntity, BinarySensorEntity):
+    """Presence of one tracked callsign/registration, pushed when its status changes and periodically while present."""
+
+    _attr_icon = "mdi:airplane-marker"
+    _attr_device_class = BinarySensorDeviceClass.PRESENCE
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, target: str) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.target = target
+        self._attr_name = f"Air Traffic {target}"
+        self._attr_unique_id = f"{entry.entry_id}_target_{_sanitize_id(target)}"
+        self._attr_is_on = False
+        self._attr_extra_state_attributes = {"target": target}
+
+    async def async_added_to_hass(self) -> None:
+        data = async_get_entry_data(self.hass, self.entry.entry_id)
+        store = data.latest if data is not None else {}
+        state = (store.get("targets") or {}).get(self.target)
+        # a restored store only knows present/hex, the entity's own last state has the attributes
+        last = await self.async_get_last_state() if state is None or store.get("restored") else None
+        if last is not None:
+            self._attr_is_on = last.state == "on"
+            self._attr_extra_state_attributes = restored_attributes(last)
+        elif state is not None:
+            self._apply(state)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_TARGET_UPDATED.format(self.entry.entry_id, self.target),
+                self._handle_update,
+            )
+        )
+
+    def _apply(self, state: dict) -> None:
+        self._attr_is_on = bool(state.get("present"))
+        self._attr_extra_state_attributes = {"target": self.target, **{k: v for k, v in state.items() if k != "present"}}
+
+    @callback
+    def _handle_update(self, state: dict) -> None:
+        self._apply(state)
+        self.async_write_ha_state()
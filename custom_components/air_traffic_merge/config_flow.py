@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import os
+
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.helpers import selector
 
+from .alerts import parse_hex_ranges, parse_squawks
+from .source import normalize_adsb_url
+
 from .const import (
     DOMAIN,
     CONF_SOURCE_MODE,
@@ -18,12 +23,46 @@ from .const import (
     CONF_TRACK_MODE,
     CONF_TRACK_CALLSIGNS,
     CONF_TRACK_REGISTRATIONS,
+    CONF_AIRCRAFT_DB,
+    CONF_ROUTE_FILE,
+    CONF_RECORD_SNAPSHOTS,
+    CONF_RECORD_MAX_MB,
+    CONF_REPLAY_FILE,
+    CONF_REPLAY_SPEED,
+    CONF_EVENT_MISS_POLLS,
+    CONF_EVENT_MISS_SECONDS,
+    CONF_EVENT_COOLDOWN,
+    CONF_EVENT_BATCH,
+    CONF_WORKER_MODE,
+    CONF_WORKER_RADIUS_KM,
+    CONF_ATTRIBUTE_BUDGET_KB,
+    CONF_ALERT_SQUAWKS,
+    CONF_ALERT_DESCENT_FPM,
+    CONF_ALERT_MILITARY,
+    CONF_ALERT_HEX_RANGES,
+    ADSB_SOURCE_REPLAY,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_ADSB_SOURCE,
     DEFAULT_ENABLE_TRACKING,
     DEFAULT_TRACK_MODE,
     DEFAULT_TRACK_CALLSIGNS,
     DEFAULT_TRACK_REGISTRATIONS,
+    DEFAULT_AIRCRAFT_DB,
+    DEFAULT_ROUTE_FILE,
+    DEFAULT_RECORD_SNAPSHOTS,
+    DEFAULT_RECORD_MAX_MB,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_EVENT_MISS_POLLS,
+    DEFAULT_EVENT_MISS_SECONDS,
+    DEFAULT_EVENT_COOLDOWN,
+    DEFAULT_EVENT_BATCH,
+    DEFAULT_WORKER_MODE,
+    DEFAULT_WORKER_RADIUS_KM,
+    DEFAULT_ATTRIBUTE_BUDGET_KB,
+    DEFAULT_ALERT_SQUAWKS,
+    DEFAULT_ALERT_DESCENT_FPM,
+    DEFAULT_ALERT_MILITARY,
+    DEFAULT_ALERT_HEX_RANGES,
 )
 
 SOURCE_FR24_ONLY = "fr24_only"
@@ -31,18 +70,6 @@ SOURCE_ADSB_ONLY = "adsb_only"
 SOURCE_BOTH = "both"
 
 
-def _normalize_adsb_url(url: str) -> str:
-    u = (url or "").strip()
-    if not u:
-        return u
-    if not (u.startswith("http://") or u.startswith("https://")):
-        return u
-    if "aircraft.json" in u:
-        return u
-    u = u.rstrip("/")
-    return f"{u}/data/aircraft.json"
-
-
 class AirTrafficMergeFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
@@ -123,6 +150,8 @@ class AirTrafficMergeFlow(config_entries.ConfigFlow, domain=DOMAIN):
             adsb_source = self._data.get(CONF_ADSB_SOURCE, DEFAULT_ADSB_SOURCE)
             if adsb_source == "url":
                 return await self.async_step_adsb_url()
+            if adsb_source == ADSB_SOURCE_REPLAY:
+                return await self.async_step_adsb_replay()
             return await self.async_step_adsb_entity()
 
         schema = vol.Schema(
@@ -135,6 +164,7 @@ class AirTrafficMergeFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         options=[
                             {"label": "ADS-B per URL (aircraft.json)", "value": "url"},
                             {"label": "ADS-B bestehender Sensor (attributes.aircraft)", "value": "entity"},
+                            {"label": "ADS-B Aufzeichnung abspielen (Replay)", "value": ADSB_SOURCE_REPLAY},
                         ],
                         mode="dropdown",
                     )
@@ -154,7 +184,7 @@ class AirTrafficMergeFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             url_raw = str(user_input.get(CONF_ADSB_URL, "") or "").strip()
-            url = _normalize_adsb_url(url_raw)
+            url = normalize_adsb_url(url_raw)
 
             if not (url.startswith("http://") or url.startswith("https://")):
                 errors[CONF_ADSB_URL] = "invalid_url"
@@ -194,6 +224,36 @@ class AirTrafficMergeFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
         return self.async_show_form(step_id="adsb_entity", data_schema=schema, errors=errors)
 
+    async def async_step_adsb_replay(self, user_input=None):
+        """Step 4c: Replay a recorded snapshot log (offline testing)."""
+        errors = {}
+
+        if user_input is not None:
+            path = str(user_input.get(CONF_REPLAY_FILE, "") or "").strip()
+            full = path if os.path.isabs(path) else self.hass.config.path(path)
+            if not path or not await self.hass.async_add_executor_job(os.path.isfile, full):
+                errors[CONF_REPLAY_FILE] = "file_not_found"
+            else:
+                self._data[CONF_REPLAY_FILE] = path
+                self._data[CONF_REPLAY_SPEED] = float(user_input.get(CONF_REPLAY_SPEED, DEFAULT_REPLAY_SPEED))
+                self._data.pop(CONF_ADSB_URL, None)
+                self._data.pop(CONF_ADSB_ENTITY, None)
+
+                if self._data.get(CONF_ENABLE_TRACKING):
+                    return await self.async_step_tracking_mode()
+                return self._create_entry()
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_REPLAY_FILE, default=self._data.get(CONF_REPLAY_FILE, "")): str,
+                vol.Optional(
+                    CONF_REPLAY_SPEED,
+                    default=float(self._data.get(CONF_REPLAY_SPEED, DEFAULT_REPLAY_SPEED)),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=1000)),
+            }
+        )
+        return self.async_show_form(step_id="adsb_replay", data_schema=schema, errors=errors)
+
     async def async_step_tracking_mode(self, user_input=None):
         """Step 5: Tracking mode (only if enabled)."""
         errors = {}
@@ -263,6 +323,8 @@ class AirTrafficMergeFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data.pop(CONF_ADSB_SOURCE, None)
             data.pop(CONF_ADSB_URL, None)
             data.pop(CONF_ADSB_ENTITY, None)
+            data.pop(CONF_REPLAY_FILE, None)
+            data.pop(CONF_REPLAY_SPEED, None)
             data.pop(CONF_SCAN_INTERVAL, None)
 
         if not data.get(CONF_ENABLE_TRACKING, False):
@@ -288,7 +350,26 @@ class AirTrafficMergeOptionsFlow(config_entries.OptionsFlow):
         self._options = dict(config_entry.options)
 
     async def async_step_init(self, user_input=None):
+        errors = {}
+
         if user_input is not None:
+            for key in (CONF_AIRCRAFT_DB, CONF_ROUTE_FILE):
+                path = str(user_input.get(key, "") or "").strip()
+                user_input[key] = path
+                if path and not await self.hass.async_add_executor_job(
+                    os.path.isfile, path if os.path.isabs(path) else self.hass.config.path(path)
+                ):
+                    errors[key] = "file_not_found"
+            try:
+                parse_squawks(user_input.get(CONF_ALERT_SQUAWKS, ""))
+            except ValueError:
+                errors[CONF_ALERT_SQUAWKS] = "invalid_squawks"
+            try:
+                parse_hex_ranges(user_input.get(CONF_ALERT_HEX_RANGES, ""))
+            except ValueError:
+                errors[CONF_ALERT_HEX_RANGES] = "invalid_hex_ranges"
+
+        if user_input is not None and not errors:
             self._options.update(user_input)
 
             if self._options.get(CONF_ENABLE_TRACKING):
@@ -313,9 +394,53 @@ class AirTrafficMergeOptionsFlow(config_entries.OptionsFlow):
             {
                 vol.Optional(CONF_SCAN_INTERVAL, default=scan_default): vol.Coerce(int),
                 vol.Optional(CONF_ENABLE_TRACKING, default=enable_default): bool,
+                vol.Optional(
+                    CONF_AIRCRAFT_DB,
+                    default=self._options.get(CONF_AIRCRAFT_DB, DEFAULT_AIRCRAFT_DB),
+                ): str,
+                vol.Optional(
+                    CONF_ROUTE_FILE,
+                    default=self._options.get(CONF_ROUTE_FILE, DEFAULT_ROUTE_FILE),
+                ): str,
+                vol.Optional(
+                    CONF_RECORD_SNAPSHOTS,
+                    default=bool(self._options.get(CONF_RECORD_SNAPSHOTS, DEFAULT_RECORD_SNAPSHOTS)),
+                ): bool,
+                vol.Optional(
+                    CONF_RECORD_MAX_MB,
+                    default=int(self._options.get(CONF_RECORD_MAX_MB, DEFAULT_RECORD_MAX_MB)),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_WORKER_MODE,
+                    default=bool(self._options.get(CONF_WORKER_MODE, DEFAULT_WORKER_MODE)),
+                ): bool,
+                vol.Optional(
+                    CONF_WORKER_RADIUS_KM,
+                    default=int(self._options.get(CONF_WORKER_RADIUS_KM, DEFAULT_WORKER_RADIUS_KM)),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_ATTRIBUTE_BUDGET_KB,
+                    default=int(self._options.get(CONF_ATTRIBUTE_BUDGET_KB, DEFAULT_ATTRIBUTE_BUDGET_KB)),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_ALERT_SQUAWKS,
+                    default=self._options.get(CONF_ALERT_SQUAWKS, DEFAULT_ALERT_SQUAWKS),
+                ): str,
+                vol.Optional(
+                    CONF_ALERT_DESCENT_FPM,
+                    default=int(self._options.get(CONF_ALERT_DESCENT_FPM, DEFAULT_ALERT_DESCENT_FPM)),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_ALERT_MILITARY,
+                    default=bool(self._options.get(CONF_ALERT_MILITARY, DEFAULT_ALERT_MILITARY)),
+                ): bool,
+                vol.Optional(
+                    CONF_ALERT_HEX_RANGES,
+                    default=self._options.get(CONF_ALERT_HEX_RANGES, DEFAULT_ALERT_HEX_RANGES),
+                ): str,
             }
         )
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
 
     async def async_step_tracking(self, user_input=None):
         if user_input is not None:
@@ -363,5 +488,21 @@ class AirTrafficMergeOptionsFlow(config_entries.OptionsFlow):
                     CONF_TRACK_REGISTRATIONS,
                     default=self._options.get(CONF_TRACK_REGISTRATIONS, DEFAULT_TRACK_REGISTRATIONS),
                 ): str,
+                vol.Optional(
+                    CONF_EVENT_MISS_POLLS,
+                    default=int(self._options.get(CONF_EVENT_MISS_POLLS, DEFAULT_EVENT_MISS_POLLS)),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_EVENT_MISS_SECONDS,
+                    default=int(self._options.get(CONF_EVENT_MISS_SECONDS, DEFAULT_EVENT_MISS_SECONDS)),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_EVENT_COOLDOWN,
+                    default=int(self._options.get(CONF_EVENT_COOLDOWN, DEFAULT_EVENT_COOLDOWN)),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_EVENT_BATCH,
+                    default=bool(self._options.get(CONF_EVENT_BATCH, DEFAULT_EVENT_BATCH)),
+                ): bool,
             }
         )
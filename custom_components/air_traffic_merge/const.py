@@ -1,5 +1,10 @@
 DOMAIN = "air_traffic_merge"
 
+# Dispatcher signal after each update, formatted with the entry id
+SIGNAL_FLIGHTS_UPDATED = f"{DOMAIN}_flights_updated_{{}}"
+# Dispatcher signal when one tracked target changes, formatted with entry id and target
+SIGNAL_TARGET_UPDATED = f"{DOMAIN}_target_updated_{{}}_{{}}"
+
 # Source selection
 CONF_SOURCE_MODE = "source_mode"
 SOURCE_FR24_ONLY = "fr24_only"
@@ -12,7 +17,8 @@ CONF_FR24_ENTITY = "fr24_entity"
 
 # ADS-B
 CONF_ADSB_SOURCE = "adsb_source"
-DEFAULT_ADSB_SOURCE = "url"  # "url" oder "entity"
+DEFAULT_ADSB_SOURCE = "url"  # "url", "entity" oder "replay"
+ADSB_SOURCE_REPLAY = "replay"
 
 CONF_ADSB_URL = "adsb_url"
 CONF_ADSB_ENTITY = "adsb_entity"
@@ -33,3 +39,61 @@ CONF_TRACK_REGISTRATIONS = "track_registrations"
 
 DEFAULT_TRACK_CALLSIGNS = ""
 DEFAULT_TRACK_REGISTRATIONS = ""
+
+# Offline aircraft database (tar1090-db CSV or compiled file), optional
+CONF_AIRCRAFT_DB = "aircraft_db"
+DEFAULT_AIRCRAFT_DB = ""
+
+# Local callsign -> route file (CSV), optional
+CONF_ROUTE_FILE = "route_file"
+DEFAULT_ROUTE_FILE = ""
+
+# Record fetched aircraft.json payloads (for replay)
+CONF_RECORD_SNAPSHOTS = "record_snapshots"
+DEFAULT_RECORD_SNAPSHOTS = False
+CONF_RECORD_MAX_MB = "record_max_mb"
+DEFAULT_RECORD_MAX_MB = 50
+
+# Replay a recorded log instead of a live receiver
+CONF_REPLAY_FILE = "replay_file"
+CONF_REPLAY_SPEED = "replay_speed"
+DEFAULT_REPLAY_SPEED = 1.0
+
+# Tracked appear/disappear events: hysteresis, per-target cooldown, optional batch event
+CONF_EVENT_MISS_POLLS = "event_miss_polls"
+DEFAULT_EVENT_MISS_POLLS = 3
+CONF_EVENT_MISS_SECONDS = "event_miss_seconds"
+DEFAULT_EVENT_MISS_SECONDS = 60
+CONF_EVENT_COOLDOWN = "event_cooldown"
+DEFAULT_EVENT_COOLDOWN = 120
+CONF_EVENT_BATCH = "event_batch"
+DEFAULT_EVENT_BATCH = False
+
+EVENT_TRACKED = f"{DOMAIN}_tracked"
+EVENT_TRACKED_BATCH = f"{DOMAIN}_tracked_batch"
+
+# Fetch, decode and filter very large feeds in a separate worker process
+CONF_WORKER_MODE = "worker_mode"
+DEFAULT_WORKER_MODE = False
+# Aircraft beyond this distance (km) are dropped in the worker, tracked ones are kept
+CONF_WORKER_RADIUS_KM = "worker_radius_km"
+DEFAULT_WORKER_RADIUS_KM = 250
+
+# Size budget for the merged sensor's attributes, 0 = off (recorder skips attributes above 16 KiB)
+CONF_ATTRIBUTE_BUDGET_KB = "attribute_budget_kb"
+DEFAULT_ATTRIBUTE_BUDGET_KB = 0
+
+# Alerts over the raw aircraft table (air_traffic_merge_alert events)
+CONF_ALERT_SQUAWKS = "alert_squawks"
+DEFAULT_ALERT_SQUAWKS = "7500,7600,7700"
+# Descent rate in ft/min that triggers an alert (0 = off)
+CONF_ALERT_DESCENT_FPM = "alert_descent_fpm"
+DEFAULT_ALERT_DESCENT_FPM = 0
+# readsb/aircraft db military flag
+CONF_ALERT_MILITARY = "alert_military"
+DEFAULT_ALERT_MILITARY = False
+# ICAO hex ranges, e.g. "3f0000-3fffff,ae0000-afffff"
+CONF_ALERT_HEX_RANGES = "alert_hex_ranges"
+DEFAULT_ALERT_HEX_RANGES = ""
+
+EVENT_ALERT = f"{DOMAIN}_alert"
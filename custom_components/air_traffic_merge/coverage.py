@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import time
+from array import array
+from bisect import bisect_right
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .geo import bearing_deg, distance_km, num
+
+STORAGE_VERSION = 1
+# Persisted at most every SAVE_DELAY seconds and on shutdown/unload
+SAVE_DELAY = 900
+
+# 72 sectors of 5 degrees
+SECTORS = 72
+# Lower edges of the altitude bands in ft
+ALT_BANDS_FT = (0, 5000, 10000, 20000, 30000)
+# Positions older than this (readsb seen_pos) are ignored
+MAX_POS_AGE = 15
+# Ranges above this are treated as bad decodes
+MAX_RANGE_KM = 750
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.coverage_{entry_id}"
+
+
+class CoverageMap:
+    """Max range per bearing sector and altitude band, in fixed-size arrays."""
+
+    def __init__(self, sectors: int = SECTORS, bands: tuple[int, ...] = ALT_BANDS_FT) -> None:
+        self.sectors = sectors
+        self.bands = bands
+        cells = sectors * len(bands)
+        self.max_km = array("f", bytes(4 * cells))
+        self.counts = array("I", bytes(4 * cells))
+        self.since: Optional[float] = None
+
+    def _band(self, alt: Any) -> int:
+        if alt == "ground":
+            return 0
+        ft = num(alt)
+        if ft is None:
+            return -1
+        return max(0, bisect_right(self.bands, ft) - 1)
+
+    def update(self, aircraft: list[dict], home_lat: float, home_lon: float, now: float) -> int:
+        """Add the fresh positions of one poll, returns how many were used."""
+        if self.since is None:
+            self.since = now
+        sector_deg = 360.0 / self.sectors
+        nbands = len(self.bands)
+        used = 0
+        for ac in aircraft:
+            if not isinstance(ac, dict):
+                continue
+            seen_pos = num(ac.get("seen_pos"))
+            if seen_pos is not None and seen_pos > MAX_POS_AGE:
+                continue
+            band = self._band(ac.get("alt_baro"))
+            if band < 0:
+                continue
+            lat, lon = num(ac.get("lat")), num(ac.get("lon"))
+            if lat is None or lon is None:
+                continue
+            dist = distance_km(home_lat, home_lon, lat, lon)
+            brg = bearing_deg(home_lat, home_lon, lat, lon)
+            if dist > MAX_RANGE_KM:
+                continue
+            i = (int(brg // sector_deg) % self.sectors) * nbands + band
+            if dist > self.max_km[i]:
+                self.max_km[i] = dist
+            self.counts[i] += 1
+            used += 1
+        return used
+
+    def as_dict(self) -> dict[str, Any]:
+        nbands = len(self.bands)
+        return {
+            "sectors": self.sectors,
+            "bands_ft": list(self.bands),
+            "since": self.since,
+            # [band][sector]
+            "max_range_km": [[round(self.max_km[s * nbands + b], 1) for s in range(self.sectors)] for b in range(nbands)],
+            "counts": [[self.counts[s * nbands + b] for s in range(self.sectors)] for b in range(nbands)],
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """Max range and position count per altitude band."""
+        nbands = len(self.bands)
+        out = {}
+        for b, edge in enumerate(self.bands):
+            cells = range(b, len(self.max_km), nbands)
+            out[f"{edge}ft"] = {
+                "max_range_km": round(max(self.max_km[i] for i in cells), 1),
+                "positions": sum(self.counts[i] for i in cells),
+            }
+        return out
+
+    def load(self, data: dict[str, Any]) -> bool:
+        """Restore from as_dict() output; False if the layout differs."""
+        if data.get("sectors") != self.sectors or tuple(data.get("bands_ft") or ()) != self.bands:
+            return False
+        nbands = len(self.bands)
+        for b, (ranges, counts) in enumerate(zip(data["max_range_km"], data["counts"])):
+            for s in range(self.sectors):
+                self.max_km[s * nbands + b] = ranges[s]
+                self.counts[s * nbands + b] = counts[s]
+        self.since = data.get("since")
+        return True
+
+
+class Coverage:
+    """Coverage map of an entry, persisted in .storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self.hass = hass
+        self.map = CoverageMap()
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, _storage_key(entry_id), private=True)
+        self._pending = False
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load()
+        if isinstance(data, dict) and not self.map.load(data):
+            self.map = CoverageMap()
+
+    @callback
+    def update(self, aircraft: list[dict], now: Optional[float] = None) -> None:
+        used = self.map.update(
+            aircraft, self.hass.config.latitude, self.hass.config.longitude, now or time.time()
+        )
+        if used and not self._pending:
+            self._pending = True
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def reset(self) -> None:
+        self.map = CoverageMap()
+        self._pending = True
+        self._store.async_delay_save(self._data_to_save, 0)
+
+    async def async_flush(self) -> None:
+        if self._pending:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._pending = False
+        return self.map.as_dict()
+
+
+async def async_remove_coverage(hass: HomeAssistant, entry_id: str) -> None:
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .coverage import Coverage
+from .sightings import SightingLog
+
+# hass.data[DOMAIN][ENTRIES_KEY][entry_id]; all other keys of hass.data[DOMAIN]
+# hold objects shared between entries (sources, worker, aircraft db, enricher)
+ENTRIES_KEY = "entries"
+
+# Attributes HA adds itself, not restored into extra_state_attributes
+_RESTORE_SKIP = {"friendly_name", "icon", "unit_of_measurement", "state_class", "device_class", "last_reset"}
+
+
+@dataclass
+class EntryData:
+    """Runtime data of one config entry, dropped when the entry unloads."""
+
+    sightings: SightingLog
+    coverage: Coverage
+    # latest merged snapshot, replaced by the merged sensor after every refresh
+    latest: dict[str, Any] = field(default_factory=dict)
+    setup_s: Optional[float] = None
+    first_refresh_s: Optional[float] = None
+    # (generation, future of (body, gzipped body)) of the aircraft.json view
+    aircraft_json: Optional[tuple[int, asyncio.Future]] = None
+
+
+@callback
+def async_get_entry_data(hass: HomeAssistant, entry_id: str) -> EntryData | None:
+    return hass.data.get(DOMAIN, {}).get(ENTRIES_KEY, {}).get(entry_id)
+
+
+@callback
+def async_entries_data(hass: HomeAssistant) -> dict[str, EntryData]:
+    """Runtime data of all loaded entries by entry id."""
+    return hass.data.get(DOMAIN, {}).get(ENTRIES_KEY, {})
+
+
+def restored_attributes(last) -> dict:
+    """Extra state attributes of a restored state, without the ones HA adds itself."""
+    return {k: v for k, v in last.attributes.items() if k not in _RESTORE_SKIP}
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ADSB_URL, DOMAIN
+from .data import async_get_entry_data
+from .source import SOURCES_KEY
+
+TO_REDACT = {CONF_ADSB_URL}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    data = async_get_entry_data(hass, entry.entry_id)
+    store = data.latest if data is not None else {}
+    tracking = store.get("tracking", {}) or {}
+    sources = hass.data.get(DOMAIN, {}).get(SOURCES_KEY, {})
+    # the worker module is only imported once an entry uses it
+    worker_mod = sys.modules.get(f"{__package__}.worker")
+    worker = hass.data.get(DOMAIN, {}).get(worker_mod.WORKER_KEY) if worker_mod is not None else None
+
+    return {
+        "data": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": async_redact_data(dict(entry.options), TO_REDACT),
+        "startup": {
+            "setup_s": data.setup_s if data is not None else None,
+            "first_refresh_s": data.first_refresh_s if data is not None else None,
+        },
+        "latest": {
+            "generation": store.get("generation"),
+            "last_update": store.get("last_update"),
+            "aircraft": len(store.get("aircraft", []) or []),
+            "flights": len(store.get("flights", []) or []),
+            "tracked": len(tracking.get("matched", []) or []),
+        },
+        "sources": len(sources),
+        "fetch_count": sum(s.fetch_count for s in sources.values()),
+        "worker_restarts": worker.restarts if worker is not None else None,
+        "coverage": data.coverage.map.summary() if data is not None else None,
+    }
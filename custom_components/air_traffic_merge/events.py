@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CONF_EVENT_BATCH,
+    CONF_EVENT_COOLDOWN,
+    CONF_EVENT_MISS_POLLS,
+    CONF_EVENT_MISS_SECONDS,
+    CONF_TRACK_MODE,
+    DEFAULT_EVENT_BATCH,
+    DEFAULT_EVENT_COOLDOWN,
+    DEFAULT_EVENT_MISS_POLLS,
+    DEFAULT_EVENT_MISS_SECONDS,
+    DEFAULT_TRACK_MODE,
+    EVENT_TRACKED,
+    EVENT_TRACKED_BATCH,
+)
+
+# Upper bound for single events per poll, the rest is announced on the next polls
+MAX_EVENTS_PER_POLL = 10
+
+# Target status fields copied into the event data
+_EVENT_FIELDS = ("hex", "callsign", "registration", "dist_km", "alt_m")
+
+
+@dataclass
+class _Target:
+    last_seen: float
+    missed: int = 0
+    announced: bool = False
+    last_fired: float = float("-inf")
+    info: dict[str, Any] = field(default_factory=dict)
+
+
+class TrackedEvents:
+    """`air_traffic_merge_tracked` appeared/disappeared events with hysteresis and cooldown.
+
+    A target appears at once; it only disappears after it was missing for
+    `event_miss_polls` polls *and* `event_miss_seconds` seconds. After an event
+    a target stays quiet for `event_cooldown` seconds; a flap within that time
+    produces no event at all. Optionally all changes of a poll go out as one
+    `air_traffic_merge_tracked_batch` event instead.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self.hass = hass
+        self.entry = entry
+        self._targets: dict[str, _Target] = {}
+        self.fired = 0
+
+    def _opt(self, key: str, default: Any) -> Any:
+        return self.entry.options.get(key, self.entry.data.get(key, default))
+
+    @callback
+    def seed(self, states: dict[str, dict], now: float) -> None:
+        """Targets present before a restart count as announced (no event for them)."""
+        for target, state in states.items():
+            if state.get("present"):
+                self._targets[target] = _Target(
+                    last_seen=float(state.get("last_seen") or now),
+                    announced=True,
+                    info=state,
+                )
+
+    @callback
+    def update(self, present: dict[str, dict], now: float) -> None:
+        """Feed the present targets of one poll (target -> status), fire due events."""
+        miss_polls = int(self._opt(CONF_EVENT_MISS_POLLS, DEFAULT_EVENT_MISS_POLLS))
+        miss_seconds = float(self._opt(CONF_EVENT_MISS_SECONDS, DEFAULT_EVENT_MISS_SECONDS))
+        cooldown = float(self._opt(CONF_EVENT_COOLDOWN, DEFAULT_EVENT_COOLDOWN))
+
+        for target, state in present.items():
+            t = self._targets.get(target)
+            if t is None:
+                t = self._targets[target] = _Target(last_seen=now)
+            t.last_seen = now
+            t.missed = 0
+            t.info = state
+
+        due: list[tuple[str, bool]] = []
+        gone: list[str] = []
+        for target, t in self._targets.items():
+            if target not in present:
+                t.missed += 1
+            is_present = t.missed == 0 or t.missed < miss_polls or now - t.last_seen < miss_seconds
+            if is_present == t.announced:
+                if not is_present and now - t.last_fired >= cooldown:
+                    gone.append(target)
+                continue
+            if now - t.last_fired >= cooldown:
+                due.append((target, is_present))
+        for target in gone:
+            del self._targets[target]
+
+        if not due:
+            return
+        if self._opt(CONF_EVENT_BATCH, DEFAULT_EVENT_BATCH):
+            self._fire_batch(due, now)
+        else:
+            self._fire_single(due[:MAX_EVENTS_PER_POLL], now)
+
+    def _event_data(self, target: str, appeared: bool, now: float) -> dict[str, Any]:
+        info = self._targets[target].info
+        return {
+            "action": "appeared" if appeared else "disappeared",
+            "target": target,
+            "last_update": int(now),
+            "track_mode": self._opt(CONF_TRACK_MODE, DEFAULT_TRACK_MODE),
+            **{k: info.get(k) for k in _EVENT_FIELDS},
+        }
+
+    def _mark(self, target: str, appeared: bool, now: float) -> None:
+        t = self._targets[target]
+        t.announced = appeared
+        t.last_fired = now
+
+    def _fire_single(self, due: list[tuple[str, bool]], now: float) -> None:
+        for target, appeared in due:
+            self.hass.bus.async_fire(EVENT_TRACKED, self._event_data(target, appeared, now))
+            self._mark(target, appeared, now)
+            self.fired += 1
+
+    def _fire_batch(self, due: list[tuple[str, bool]], now: float) -> None:
+        appeared = [self._event_data(t, True, now) for t, a in due if a]
+        disappeared = [self._event_data(t, False, now) for t, a in due if not a]
+        self.hass.bus.async_fire(
+            EVENT_TRACKED_BATCH,
+            {"appeared": appeared, "disappeared": disappeared, "last_update": int(now)},
+        )
+        for target, a in due:
+            self._mark(target, a, now)
+        self.fired += 1
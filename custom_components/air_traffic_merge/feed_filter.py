@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import sys
+import urllib.request
+from typing import Any, Iterable
+
+# Child process of worker.FeedWorker, started as a plain script
+# (`python -I feed_filter.py`): only the standard library may be imported here,
+# neither this package nor Home Assistant. Requests and replies are JSON lines
+# on stdin/stdout, one reply per request; failures come back as {"error": ...}.
+
+_EARTH_RADIUS_KM = 6371.0
+
+# Only these readsb fields are sent back to Home Assistant
+_FIELDS = (
+    "hex", "flight", "r", "t", "desc", "ownOp", "dbFlags",
+    "alt_baro", "gs", "track", "baro_rate", "squawk", "emergency",
+    "lat", "lon", "seen", "seen_pos", "r_dst", "r_dir", "messages",
+)
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    # same equirectangular projection as geo.distance_km
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2)) * _EARTH_RADIUS_KM
+    y = math.radians(lat2 - lat1) * _EARTH_RADIUS_KM
+    return math.hypot(x, y)
+
+
+def fetch_filtered(
+    url: str,
+    timeout: float,
+    home_lat: float,
+    home_lon: float,
+    radius_km: float,
+    callsigns: Iterable[str],
+    registrations: Iterable[str],
+) -> dict[str, Any]:
+    """Fetch and decode aircraft.json, keep tracked aircraft and those within `radius_km`."""
+    callsigns = set(callsigns)
+    registrations = set(registrations)
+    req = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        raw = resp.read()
+        if resp.headers.get("Content-Encoding") == "gzip":
+            raw = gzip.decompress(raw)
+    data = json.loads(raw)
+
+    max_dlat = radius_km / 111.0
+    kept = []
+    aircraft = data.get("aircraft") or []
+    for ac in aircraft:
+        if not isinstance(ac, dict):
+            continue
+        if callsigns and (ac.get("flight") or "").strip().upper() in callsigns:
+            pass
+        elif registrations and (ac.get("r") or "").strip().upper() in registrations:
+            pass
+        elif radius_km > 0:
+            lat, lon = ac.get("lat"), ac.get("lon")
+            if lat is None or lon is None or abs(lat - home_lat) > max_dlat:
+                continue
+            if _distance_km(home_lat, home_lon, lat, lon) > radius_km:
+                continue
+        kept.append({k: ac[k] for k in _FIELDS if k in ac})
+
+    return {
+        "now": data.get("now"),
+        "messages": data.get("messages"),
+        "aircraft": kept,
+        "total": len(aircraft),
+    }
+
+
+def main() -> None:
+    out = sys.stdout.buffer
+    for line in sys.stdin.buffer:
+        try:
+            reply = fetch_filtered(**json.loads(line))
+        except Exception as err:  # reported to the caller, the process keeps running
+            reply = {"error": f"{type(err).__name__}: {err}"}
+        out.write(json.dumps(reply, separators=(",", ":")).encode("utf-8") + b"\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Optional
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def num(v: Any) -> Optional[float]:
+    """Finite float or None (readsb fields may be missing, strings or "ground")."""
+    try:
+        if v is None:
+            return None
+        f = float(v)
+    except Exception:
+        return None
+    return f if math.isfinite(f) else None
+
+
+def project(lat: float, lon: float, home_lat: float, home_lon: float) -> tuple[float, float]:
+    """Equirectangular projection around home, returns (east_km, north_km).
+
+    Accurate enough for the few hundred km a receiver covers.
+    """
+    x = math.radians(lon - home_lon) * math.cos(math.radians((lat + home_lat) / 2)) * EARTH_RADIUS_KM
+    y = math.radians(lat - home_lat) * EARTH_RADIUS_KM
+    return x, y
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    x, y = project(lat2, lon2, lat1, lon1)
+    return math.hypot(x, y)
+
+
+def bearing_deg(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Bearing from point 1 to point 2, 0-360 degrees from north."""
+    x, y = project(lat2, lon2, lat1, lon1)
+    return math.degrees(math.atan2(x, y)) % 360
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Iterator, Optional
+
+from .geo import bearing_deg, distance_km, num, project
+
+# Samples kept per aircraft (fixed memory cap)
+HISTORY_SIZE = 32
+# Seconds without a new position before an aircraft's history is dropped
+HISTORY_TIMEOUT = 300
+# Minimum time span of the history before it is used for the velocity estimate
+MIN_VELOCITY_SPAN = 10.0
+# Only samples this recent are used for the velocity estimate
+VELOCITY_WINDOW = 120.0
+
+# Downsampling: a new sample replaces the newest one while the aircraft moves
+# less than TRAIL_MIN_DIST_KM, or flies straight (turn below TRAIL_MIN_TURN_DEG)
+# and the replaced point would leave a gap below TRAIL_MAX_SPACING_KM.
+TRAIL_MIN_DIST_KM = 0.05
+TRAIL_MIN_TURN_DEG = 5.0
+TRAIL_MAX_SPACING_KM = 5.0
+# Trails are only exported for this time window ...
+TRAIL_MAX_AGE = 600
+# ... and for tracked aircraft or aircraft within this distance
+TRAIL_RADIUS_KM = 30.0
+
+# ts, lat, lon, alt_m
+_FIELDS = 4
+
+
+def _encode_value(v: int, out: list[str]) -> None:
+    v = ~(v << 1) if v < 0 else v << 1
+    while v >= 0x20:
+        out.append(chr((0x20 | (v & 0x1F)) + 63))
+        v >>= 5
+    out.append(chr(v + 63))
+
+
+def encode_polyline(points: list[tuple[float, float]]) -> str:
+    """Encoded polyline (precision 5) as used by Google Maps / Leaflet plugins."""
+    out: list[str] = []
+    plat = plon = 0
+    for lat, lon in points:
+        ilat = int(round(lat * 1e5))
+        ilon = int(round(lon * 1e5))
+        _encode_value(ilat - plat, out)
+        _encode_value(ilon - plon, out)
+        plat, plon = ilat, ilon
+    return "".join(out)
+
+
+class PositionRing:
+    """Fixed-size ring buffer of (ts, lat, lon, alt_m) samples for one aircraft."""
+
+    __slots__ = ("_buf", "_size", "_head", "_count", "last_seen", "gs_kmh", "track_deg")
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        self._buf = array("d", bytes(8 * _FIELDS * size))
+        self._size = size
+        self._head = 0  # next write slot
+        self._count = 0
+        self.last_seen: float = 0.0
+        self.gs_kmh: Optional[float] = None
+        self.track_deg: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _slot(self, i: int) -> tuple[float, float, float, float]:
+        o = i * _FIELDS
+        b = self._buf
+        return b[o], b[o + 1], b[o + 2], b[o + 3]
+
+    def last(self) -> Optional[tuple[float, float, float, float]]:
+        if not self._count:
+            return None
+        return self._slot((self._head - 1) % self._size)
+
+    def first(self) -> Optional[tuple[float, float, float, float]]:
+        if not self._count:
+            return None
+        return self._slot((self._head - self._count) % self._size)
+
+    def samples(self) -> Iterator[tuple[float, float, float, float]]:
+        """Oldest to newest."""
+        start = self._head - self._count
+        for i in range(self._count):
+            yield self._slot((start + i) % self._size)
+
+    def samples_reversed(self) -> Iterator[tuple[float, float, float, float]]:
+        """Newest to oldest."""
+        for i in range(1, self._count + 1):
+            yield self._slot((self._head - i) % self._size)
+
+    def trail(self, since: float = 0.0) -> str:
+        """Encoded polyline of all samples newer than `since`, oldest first."""
+        return encode_polyline([(s[1], s[2]) for s in self.samples() if s[0] >= since])
+
+    def _is_redundant(self, lat: float, lon: float) -> bool:
+        """True if the newest sample carries no shape information next to the new one."""
+        last = self.last()
+        if distance_km(last[1], last[2], lat, lon) < TRAIL_MIN_DIST_KM:
+            return True
+        if self._count < 2:
+            return False
+        prev = self._slot((self._head - 2) % self._size)
+        if distance_km(prev[1], prev[2], lat, lon) > TRAIL_MAX_SPACING_KM:
+            return False
+        turn = abs(bearing_deg(prev[1], prev[2], last[1], last[2]) - bearing_deg(last[1], last[2], lat, lon))
+        return min(turn, 360 - turn) < TRAIL_MIN_TURN_DEG
+
+    def append(self, ts: float, lat: float, lon: float, alt_m: Optional[float]) -> bool:
+        last = self.last()
+        if last is not None and ts <= last[0]:
+            # same position report as last poll (or out of order)
+            return False
+        if last is not None and self._is_redundant(lat, lon):
+            # overwrite the newest sample instead of growing the trail
+            self._head = (self._head - 1) % self._size
+            self._count -= 1
+        o = self._head * _FIELDS
+        b = self._buf
+        b[o] = ts
+        b[o + 1] = lat
+        b[o + 2] = lon
+        b[o + 3] = alt_m if alt_m is not None else math.nan
+        self._head = (self._head + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+        return True
+
+
+class TrackHistory:
+    """Per-hex position history, updated incrementally from aircraft.json on every poll."""
+
+    def __init__(self, size: int = HISTORY_SIZE, timeout: float = HISTORY_TIMEOUT) -> None:
+        self._size = size
+        self._timeout = timeout
+        self._rings: dict[str, PositionRing] = {}
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def get(self, hx: str) -> Optional[PositionRing]:
+        return self._rings.get((hx or "").strip().lower())
+
+    def update(self, aircraft: list[dict], now: float) -> None:
+        for ac in aircraft or []:
+            if not isinstance(ac, dict):
+                continue
+            hx = (ac.get("hex") or "").strip().lower()
+            lat = num(ac.get("lat"))
+            lon = num(ac.get("lon"))
+            if not hx or lat is None or lon is None:
+                continue
+
+            # readsb: seen_pos = seconds since the position was received
+            ts = now - (num(ac.get("seen_pos")) or 0.0)
+
+            ring = self._rings.get(hx)
+            if ring is None:
+                ring = self._rings[hx] = PositionRing(self._size)
+
+            alt_ft = num(ac.get("alt_baro"))
+            ring.append(ts, lat, lon, alt_ft * 0.3048 if alt_ft is not None else None)
+            ring.last_seen = now
+
+            gs = num(ac.get("gs"))
+            ring.gs_kmh = gs * 1.852 if gs is not None else None
+            ring.track_deg = num(ac.get("track"))
+
+        self.prune(now)
+
+    def prune(self, now: float) -> None:
+        stale = [hx for hx, ring in self._rings.items() if now - ring.last_seen > self._timeout]
+        for hx in stale:
+            del self._rings[hx]
+
+    def closest_approach(self, hx: str, home_lat: float, home_lon: float, now: float) -> dict | None:
+        ring = self.get(hx)
+        if ring is None:
+            return None
+        return closest_approach(ring, home_lat, home_lon, now)
+
+
+def _velocity(ring: PositionRing, home_lat: float, home_lon: float) -> Optional[tuple[float, float]]:
+    """Velocity in km/s (east, north), from recent history if long enough, else from gs/track."""
+    last = ring.last()
+    ref = None
+    if last is not None:
+        for s in ring.samples_reversed():
+            age = last[0] - s[0]
+            if age > VELOCITY_WINDOW:
+                break
+            if age >= MIN_VELOCITY_SPAN:
+                ref = s
+                break
+    if ref is not None:
+        x0, y0 = project(ref[1], ref[2], home_lat, home_lon)
+        x1, y1 = project(last[1], last[2], home_lat, home_lon)
+        dt = last[0] - ref[0]
+        return (x1 - x0) / dt, (y1 - y0) / dt
+
+    if ring.gs_kmh is not None and ring.track_deg is not None:
+        v = ring.gs_kmh / 3600.0
+        trk = math.radians(ring.track_deg)
+        return v * math.sin(trk), v * math.cos(trk)
+    return None
+
+
+def closest_approach(ring: PositionRing, home_lat: float, home_lon: float, now: float) -> dict | None:
+    """Predict the closest point of approach to home on a straight-line track.
+
+    Returns cpa_km, cpa_in_s (0 if the aircraft is already moving away) and
+    cpa_eta (epoch seconds), or None if there is no usable position/velocity.
+    """
+    last = ring.last()
+    if last is None:
+        return None
+    vel = _velocity(ring, home_lat, home_lon)
+    if vel is None:
+        return None
+
+    vx, vy = vel
+    px, py = project(last[1], last[2], home_lat, home_lon)
+    # extrapolate the last known position to now
+    age = max(0.0, now - last[0])
+    px += vx * age
+    py += vy * age
+
+    v2 = vx * vx + vy * vy
+    t = 0.0 if v2 < 1e-9 else max(0.0, -(px * vx + py * vy) / v2)
+
+    return {
+        "cpa_km": round(math.hypot(px + vx * t, py + vy * t), 1),
+        "cpa_in_s": int(round(t)),
+        "cpa_eta": int(now + t),
+        "dist_km": round(math.hypot(px, py), 1),
+        "approaching": t > 0,
+    }
@@ -0,0 +1,527 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import sys
+import time
+from types import ModuleType
+from typing import Awaitable, Callable, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    SIGNAL_FLIGHTS_UPDATED,
+    SIGNAL_TARGET_UPDATED,
+    CONF_ENABLE_TRACKING,
+    CONF_TRACK_MODE,
+    CONF_TRACK_CALLSIGNS,
+    CONF_TRACK_REGISTRATIONS,
+    CONF_AIRCRAFT_DB,
+    CONF_ROUTE_FILE,
+    CONF_ATTRIBUTE_BUDGET_KB,
+    DEFAULT_ENABLE_TRACKING,
+    DEFAULT_TRACK_MODE,
+    DEFAULT_AIRCRAFT_DB,
+    DEFAULT_ROUTE_FILE,
+    DEFAULT_ATTRIBUTE_BUDGET_KB,
+)
+from .airlines import CallsignEnricher, async_get_enricher
+from .alerts import AlertEngine
+from .data import EntryData
+from .events import TrackedEvents
+from .history import TRAIL_MAX_AGE, TRAIL_RADIUS_KM, TrackHistory
+from .statistics import TrafficStatistics
+
+# Seconds between attribute refreshes of a present target's binary sensor
+TARGET_ATTR_INTERVAL = 60
+
+
+async def _async_import(hass: HomeAssistant, name: str) -> ModuleType:
+    """Import an optional submodule (aircraft db, replay) on first use, off the event loop."""
+    full = f"{__package__}.{name}"
+    mod = sys.modules.get(full)
+    if mod is None:
+        mod = await hass.async_add_import_executor_job(importlib.import_module, full)
+    return mod
+
+
+def _to_m(ft):
+    try:
+        return round(float(ft) * 0.3048)
+    except Exception:
+        return None
+
+
+def _to_kmh(kn):
+    try:
+        return round(float(kn) * 1.852)
+    except Exception:
+        return None
+
+
+def _safe_float(v):
+    try:
+        if v is None:
+            return None
+        return float(v)
+    except Exception:
+        return None
+
+
+def _split_csv(s: str) -> list[str]:
+    return [p.strip() for p in (s or "").split(",") if p.strip()]
+
+
+def _norm(s: str) -> str:
+    return (s or "").strip().upper()
+
+
+def _extract_callsign(ac: dict) -> str:
+    # readsb aircraft.json uses "flight" for callsign (often padded)
+    return (ac.get("flight") or "").strip()
+
+
+def _extract_registration(ac: dict) -> str:
+    # readsb aircraft.json uses "r" for registration
+    return (ac.get("r") or "").strip()
+
+
+def _tracking_options(entry: ConfigEntry) -> tuple[bool, str, list[str], list[str]]:
+    """(enabled, mode, normalized callsigns, normalized registrations) from the entry options."""
+    enable = bool(
+        entry.options.get(
+            CONF_ENABLE_TRACKING,
+            entry.data.get(CONF_ENABLE_TRACKING, DEFAULT_ENABLE_TRACKING),
+        )
+    )
+    mode = entry.options.get(CONF_TRACK_MODE, entry.data.get(CONF_TRACK_MODE, DEFAULT_TRACK_MODE))
+    callsigns = [
+        _norm(x)
+        for x in _split_csv(entry.options.get(CONF_TRACK_CALLSIGNS, entry.data.get(CONF_TRACK_CALLSIGNS, "")))
+    ]
+    regs = [
+        _norm(x)
+        for x in _split_csv(entry.options.get(CONF_TRACK_REGISTRATIONS, entry.data.get(CONF_TRACK_REGISTRATIONS, "")))
+    ]
+    return enable, mode, callsigns, regs
+
+
+def tracking_targets(entry: ConfigEntry) -> list[str]:
+    """Configured tracking targets (normalized callsigns/registrations) for the current mode."""
+    enable, mode, callsigns, regs = _tracking_options(entry)
+    if not enable:
+        return []
+
+    targets: list[str] = []
+    if mode in ("callsign", "both"):
+        targets.extend(callsigns)
+    if mode in ("registration", "both"):
+        targets.extend(regs)
+    return list(dict.fromkeys(targets))
+
+
+def _compute_tracking(entry: ConfigEntry, aircraft: list[dict]) -> dict:
+    """Return matched sets and list (aircraft dicts)."""
+    enable, mode, callsigns, regs = _tracking_options(entry)
+    if not enable:
+        return {
+            "enabled": False,
+            "mode": DEFAULT_TRACK_MODE,
+            "want_callsigns": [],
+            "want_registrations": [],
+            "matched": [],
+            "matched_callsigns": [],
+            "matched_registrations": [],
+        }
+
+    want_callsigns = set(callsigns)
+    want_regs = set(regs)
+
+    matched = []
+    matched_callsigns = set()
+    matched_regs = set()
+
+    for ac in aircraft or []:
+        cs = _norm(_extract_callsign(ac))
+        reg = _norm(_extract_registration(ac))
+
+        cs_hit = cs and cs in want_callsigns
+        reg_hit = reg and reg in want_regs
+
+        if mode == "callsign" and cs_hit:
+            matched.append(ac)
+            matched_callsigns.add(cs)
+        elif mode == "registration" and reg_hit:
+            matched.append(ac)
+            matched_regs.add(reg)
+        elif mode == "both" and (cs_hit or reg_hit):
+            matched.append(ac)
+            if cs_hit:
+                matched_callsigns.add(cs)
+            if reg_hit:
+                matched_regs.add(reg)
+
+    return {
+        "enabled": True,
+        "mode": mode,
+        "want_callsigns": sorted(want_callsigns),
+        "want_registrations": sorted(want_regs),
+        "matched": matched,
+        "matched_callsigns": sorted(matched_callsigns),
+        "matched_registrations": sorted(matched_regs),
+    }
+
+
+def _build_flights_from_aircraft(
+    entry: ConfigEntry,
+    aircraft: list[dict],
+    tracking: dict,
+    enricher: CallsignEnricher | None = None,
+) -> list[dict]:
+    """Build the 'flights' list exactly like the Lovelace card expects."""
+    mode = tracking.get("mode", DEFAULT_TRACK_MODE)
+    want_callsigns = set(tracking.get("want_callsigns", []) or [])
+    want_regs = set(tracking.get("want_registrations", []) or [])
+
+    flights: list[dict] = []
+
+    for ac in aircraft or []:
+        callsign_raw = _extract_callsign(ac)
+        reg_raw = _extract_registration(ac)
+        hx = (ac.get("hex") or "").strip()
+
+        callsign = callsign_raw.strip()
+        reg = reg_raw.strip()
+
+        alt_m = _to_m(ac.get("alt_baro"))
+        spd_kmh = _to_kmh(ac.get("gs"))
+        dist_km = _safe_float(ac.get("r_dst"))
+        dir_deg = _safe_float(ac.get("r_dir"))
+
+        cs_norm = _norm(callsign)
+        reg_norm = _norm(reg)
+
+        cs_hit = cs_norm and cs_norm in want_callsigns
+        reg_hit = reg_norm and reg_norm in want_regs
+
+        is_tracked = False
+        tracked_by = ""
+        tracked_target = ""
+
+        if tracking.get("enabled"):
+            if mode == "callsign" and cs_hit:
+                is_tracked = True
+                tracked_by = "callsign"
+                tracked_target = cs_norm
+            elif mode == "registration" and reg_hit:
+                is_tracked = True
+                tracked_by = "registration"
+                tracked_target = reg_norm
+            elif mode == "both" and (cs_hit or reg_hit):
+                is_tracked = True
+                if reg_hit:
+                    tracked_by = "registration"
+                    tracked_target = reg_norm
+                else:
+                    tracked_by = "callsign"
+                    tracked_target = cs_norm
+
+        # airline: callsign prefix table first, operator from readsb/aircraft db as fallback
+        info = enricher.lookup(cs_norm) if enricher is not None else {}
+
+        flight = {
+            "registration": reg,
+            "hex": hx,
+            "callsign": callsign,
+            "airline": info.get("airline") or (ac.get("ownOp") or "").strip(),
+            "aircraft_model": (ac.get("t") or "").strip(),  # e.g. A320
+            "source": "ADSB",
+            "alt_m": alt_m,
+            "spd_kmh": spd_kmh,
+            "dist_km": dist_km,
+            "dir_deg": dir_deg,
+            "tracked": bool(is_tracked),
+            "tracked_target": tracked_target,
+            "tracked_by": tracked_by,
+        }
+        if info.get("route"):
+            flight["route"] = info["route"]
+        flights.append(flight)
+
+    return flights
+
+
+def _compute_approaches(history: TrackHistory, tracking: dict, home_lat: float, home_lon: float, now: float) -> list[dict]:
+    """Closest point of approach to home for every matched (tracked) aircraft."""
+    approaches: list[dict] = []
+    for ac in tracking.get("matched", []) or []:
+        hx = (ac.get("hex") or "").strip()
+        cpa = history.closest_approach(hx, home_lat, home_lon, now)
+        if cpa is None:
+            continue
+        approaches.append(
+            {
+                "hex": hx,
+                "callsign": _extract_callsign(ac),
+                "registration": _extract_registration(ac),
+                **cpa,
+            }
+        )
+    approaches.sort(key=lambda a: a["cpa_in_s"] if a["approaching"] else float("inf"))
+    return approaches
+
+
+def _attach_trails(history: TrackHistory, flights: list[dict], now: float) -> None:
+    """Add an encoded polyline `trail` to tracked and nearby flights only."""
+    since = now - TRAIL_MAX_AGE
+    for f in flights:
+        dist = f.get("dist_km")
+        if not f.get("tracked") and (dist is None or dist > TRAIL_RADIUS_KM):
+            continue
+        ring = history.get(f.get("hex", ""))
+        if ring is not None and len(ring) > 1:
+            f["trail"] = ring.trail(since)
+
+
+def _sort_key(f: dict):
+    # same order as the coordinator: tracked, then BOTH, then nearest
+    tracked_rank = 0 if f.get("tracked") else 1
+    src_rank = {"BOTH": 0, "ADSB": 1, "FR24": 2}.get(f.get("source"), 9)
+    dist = f.get("dist_km") if f.get("dist_km") is not None else 9999
+    return (tracked_rank, src_rank, dist, f.get("registration") or f.get("hex") or "")
+
+
+def _json_size(v) -> int:
+    """Size in bytes of `v` as the recorder stores it (compact UTF-8 JSON)."""
+    return len(json.dumps(v, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _fit_budget(items: list[dict], budget: int) -> tuple[list[dict], int]:
+    """Leading items that fit into `budget` bytes, and the budget left."""
+    kept: list[dict] = []
+    for item in items:
+        size = _json_size(item) + 1
+        if size > budget:
+            break
+        budget -= size
+        kept.append(item)
+    return kept, budget
+
+
+def _target_states(flights: list[dict], approaches: list[dict], now: int) -> dict[str, dict]:
+    """Status per present tracked target (first matching flight wins)."""
+    cpa_by_hex = {a["hex"]: a for a in approaches}
+    states: dict[str, dict] = {}
+    for f in flights:
+        target = f.get("tracked_target")
+        if not f.get("tracked") or not target or target in states:
+            continue
+        cpa = cpa_by_hex.get(f.get("hex"), {})
+        states[target] = {
+            "present": True,
+            "tracked_by": f.get("tracked_by", ""),
+            "hex": f.get("hex", ""),
+            "callsign": f.get("callsign", ""),
+            "registration": f.get("registration", ""),
+            "dist_km": f.get("dist_km"),
+            "alt_m": f.get("alt_m"),
+            "cpa_km": cpa.get("cpa_km"),
+            "cpa_in_s": cpa.get("cpa_in_s"),
+            "last_seen": now,
+        }
+    return states
+
+
+def _target_status(state: dict | None) -> tuple | None:
+    """The part of a target state that makes it worth signalling; position and timestamps are not."""
+    if state is None:
+        return None
+    return state["present"], state.get("hex", ""), state.get("tracked_by", "")
+
+
+def _apply_budget(attrs: dict, budget: int) -> None:
+    """Keep the attributes recordable: flights by priority first, raw aircraft of those flights with the rest."""
+    flights = sorted(attrs["flights"], key=_sort_key)
+    aircraft = attrs["aircraft"]
+    attrs["flights"] = []
+    attrs["aircraft"] = []
+    # measured with the largest possible counts, so writing them later cannot exceed the budget
+    attrs["truncated_count"] = len(flights)
+    attrs["aircraft_truncated_count"] = len(aircraft)
+    budget -= _json_size(attrs)
+
+    attrs["flights"], budget = _fit_budget(flights, budget)
+    attrs["truncated_count"] = len(flights) - len(attrs["flights"])
+
+    by_hex = {ac.get("hex"): ac for ac in aircraft if isinstance(ac, dict)}
+    ordered = [by_hex[f["hex"]] for f in attrs["flights"] if f.get("hex") in by_hex]
+    attrs["aircraft"], _budget = _fit_budget(ordered, budget)
+    attrs["aircraft_truncated_count"] = len(aircraft) - len(attrs["aircraft"])
+
+
+class MergePipeline:
+    """Per-poll work of the merged sensor for one entry, without the entity.
+
+    Aircraft db, tracking, coverage, position history, flights, trails, alerts,
+    statistics, sighting log, target states and events; tools/soak.py runs the
+    same object. The entity publishes the result (state, restore cache).
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, data: EntryData) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.data = data
+        self.history = TrackHistory()
+        self.stats = TrafficStatistics(
+            hass.config.path(DOMAIN, f"statistics_{entry.entry_id}.db"),
+            dt_util.DEFAULT_TIME_ZONE,
+        )
+        self._stats_task: Optional[asyncio.Task] = None
+        # awaited after every statistics write (statistics sensor refresh)
+        self.stats_written: Optional[Callable[[], Awaitable[None]]] = None
+        self.alerts = AlertEngine(hass, entry)
+        self.events = TrackedEvents(hass, entry)
+        self.targets: dict[str, dict] = {}
+        # when each target's state was last signalled
+        self._target_pushed: dict[str, int] = {}
+        self.generation = 0
+
+    def restore(self, restored: dict) -> None:
+        """Continue from a snapshot restored by StateCache, so target states don't flap."""
+        self.targets = restored["targets"]
+        self.generation = restored["generation"]
+        self.events.seed(self.targets, time.time())
+
+    async def async_process(self, data: dict) -> tuple[dict, dict]:
+        """Run one aircraft.json payload through the pipeline; (store, sensor attributes)."""
+        aircraft = data.get("aircraft", []) or []
+
+        # Fill registration/type/operator from the offline db before tracking,
+        # so registration tracking also works when the feed lacks "r"
+        db_source = self.entry.options.get(CONF_AIRCRAFT_DB, DEFAULT_AIRCRAFT_DB)
+        if db_source:
+            aircraft_db = await _async_import(self.hass, "aircraft_db")
+            db = await aircraft_db.async_get_aircraft_db(self.hass, db_source)
+            if db is not None:
+                aircraft = aircraft_db.enrich_aircraft(db, aircraft)
+
+        tracking = _compute_tracking(self.entry, aircraft)
+
+        # Receiver coverage: max range per bearing sector and altitude band
+        self.data.coverage.update(aircraft)
+
+        # Position history per hex (bounded) -> closest approach for tracked aircraft
+        now_ts = _safe_float(data.get("now")) or time.time()
+        self.history.update(aircraft, now_ts)
+        tracking["approaches"] = _compute_approaches(
+            self.history,
+            tracking,
+            self.hass.config.latitude,
+            self.hass.config.longitude,
+            now_ts,
+        )
+
+        # Build flights for the Lovelace card
+        enricher = await async_get_enricher(
+            self.hass,
+            self.entry.options.get(CONF_ROUTE_FILE, DEFAULT_ROUTE_FILE),
+        )
+        flights = _build_flights_from_aircraft(self.entry, aircraft, tracking, enricher)
+        _attach_trails(self.history, flights, now_ts)
+
+        # Squawk/descent/military/hex range alerts (one pass, events deduplicated per hex)
+        alerts = self.alerts.evaluate(aircraft, now_ts)
+        if alerts:
+            for f in flights:
+                hits = alerts.get(f["hex"].lower())
+                if hits:
+                    f["alerts"] = [rule for rule, _detail in hits]
+
+        # Hourly statistics, written in batches off the event loop (one write at a time)
+        self.stats.add(flights, now_ts)
+        if self.stats.flush_due(now_ts) and (self._stats_task is None or self._stats_task.done()):
+            self._stats_task = self.hass.async_create_task(self.async_flush_stats(now_ts))
+
+        # Sighting log for tracked targets (queued, written in the background)
+        self.data.sightings.update(flights, now_ts)
+
+        # Per-target entities: signal targets whose status changed, present ones
+        # also every TARGET_ATTR_INTERVAL so distance/CPA/last seen stay current
+        last_update = int(time.time())
+        targets = _target_states(flights, tracking["approaches"], last_update)
+        # appeared/disappeared bus events (hysteresis + cooldown, see events.py)
+        self.events.update(targets, last_update)
+        configured = tracking_targets(self.entry)
+        for target in configured:
+            old = self.targets.get(target)
+            if target not in targets and old is not None:
+                targets[target] = old if not old["present"] else {**old, "present": False}
+        for target, state in targets.items():
+            changed = _target_status(self.targets.get(target)) != _target_status(state)
+            due = state["present"] and last_update - self._target_pushed.get(target, 0) >= TARGET_ATTR_INTERVAL
+            if changed or due:
+                self._target_pushed[target] = last_update
+                async_dispatcher_send(
+                    self.hass, SIGNAL_TARGET_UPDATED.format(self.entry.entry_id, target), state
+                )
+        # targets no longer configured are dropped
+        self.targets = targets = {t: targets[t] for t in configured if t in targets}
+        self._target_pushed = {t: ts for t, ts in self._target_pushed.items() if t in targets}
+
+        # Store for other entities/platforms (generation: cache key for consumers)
+        self.generation += 1
+        store = self.data.latest = {
+            "aircraft": aircraft,
+            "flights": flights,
+            "tracking": tracking,
+            "targets": targets,
+            "last_update": last_update,
+            "generation": self.generation,
+            "raw": {"now": data.get("now"), "messages": data.get("messages")},
+        }
+        # websocket subscribers get only the differences
+        async_dispatcher_send(
+            self.hass, SIGNAL_FLIGHTS_UPDATED.format(self.entry.entry_id), flights, last_update
+        )
+
+        # Card expects: attributes.flights + attributes.last_update
+        tracked_active = tracking.get("matched_callsigns") or tracking.get("matched_registrations") or []
+        tracked_active_count = len(tracking.get("matched", []) or [])
+
+        attrs = {
+            "last_update": last_update,
+            "flights": flights,
+
+            # optional debug/raw
+            "aircraft": aircraft,
+            "messages": data.get("messages"),
+            "now": data.get("now"),
+
+            # tracking info (used by card chips if status_entity is provided;
+            # still useful for debug)
+            "tracking_enabled": bool(tracking.get("enabled", False)),
+            "tracked_active_count": tracked_active_count,
+            "tracked_active": tracked_active,
+            "matched_callsigns": tracking.get("matched_callsigns", []),
+            "matched_registrations": tracking.get("matched_registrations", []),
+        }
+        budget_kb = int(self.entry.options.get(CONF_ATTRIBUTE_BUDGET_KB, DEFAULT_ATTRIBUTE_BUDGET_KB))
+        if budget_kb > 0:
+            _apply_budget(attrs, budget_kb * 1024)
+        return store, attrs
+
+    async def async_flush_stats(self, now: float) -> None:
+        await self.hass.async_add_executor_job(self.stats.write, self.stats.take_batch(now))
+        if self.stats_written is not None:
+            await self.stats_written()
+
+    async def async_shutdown(self) -> None:
+        """Wait for a running statistics write, then write what is left."""
+        if self._stats_task is not None:
+            await self._stats_task
+        await self.hass.async_add_executor_job(self.stats.write, self.stats.take_batch(time.time()))
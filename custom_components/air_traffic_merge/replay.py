@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from typing import Any, BinaryIO, Iterator, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Append log: magic, then records of (ts float64, kind uint8, length uint32) + zlib(JSON)
+_MAGIC = b"ATMREC1\n"
+_RECORD = struct.Struct("<dBI")
+
+KIND_ADSB = 0
+KIND_FR24 = 1
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+BACKUP_COUNT = 2
+
+
+def _rotated(path: str, i: int) -> str:
+    return f"{path}.{i}"
+
+
+def log_files(path: str) -> list[str]:
+    """Existing files of a log, oldest first."""
+    files = [_rotated(path, i) for i in range(BACKUP_COUNT, 0, -1)]
+    files.append(path)
+    return [f for f in files if os.path.exists(f)]
+
+
+class SnapshotRecorder:
+    """Appends fetched payloads to a compressed, length-prefixed log with size cap and rotation."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _rotate(self) -> None:
+        for i in range(BACKUP_COUNT, 0, -1):
+            src = self.path if i == 1 else _rotated(self.path, i - 1)
+            if os.path.exists(src):
+                os.replace(src, _rotated(self.path, i))
+
+    def append(self, ts: float, kind: int, raw: bytes) -> None:
+        """Append a raw JSON payload as received (blocking, run in an executor)."""
+        body = zlib.compress(raw, 6)
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(body) > self.max_bytes:
+                    self._rotate()
+                new = not os.path.exists(self.path)
+                with open(self.path, "ab") as fh:
+                    if new:
+                        fh.write(_MAGIC)
+                    fh.write(_RECORD.pack(ts, kind, len(body)))
+                    fh.write(body)
+            except Exception as err:
+                _LOGGER.warning("Recording snapshot to %s failed: %s", self.path, err)
+
+
+def _read_records(fh: BinaryIO) -> Iterator[tuple[float, int, bytes]]:
+    if fh.read(len(_MAGIC)) != _MAGIC:
+        return
+    while True:
+        head = fh.read(_RECORD.size)
+        if len(head) < _RECORD.size:
+            return
+        ts, kind, length = _RECORD.unpack(head)
+        body = fh.read(length)
+        if len(body) < length:
+            # truncated tail (e.g. crash while writing)
+            return
+        yield ts, kind, body
+
+
+def iter_records(path: str) -> Iterator[tuple[float, int, bytes]]:
+    """All records of a log (rotated files first), bodies still compressed."""
+    for f in log_files(path):
+        with open(f, "rb") as fh:
+            yield from _read_records(fh)
+
+
+def decode(body: bytes) -> Any:
+    return json.loads(zlib.decompress(body))
+
+
+class SnapshotPlayer:
+    """Replays a recorded log on a virtual clock running `speed` times real time, looping at the end."""
+
+    def __init__(self, path: str, speed: float = 1.0, kind: int = KIND_ADSB) -> None:
+        self.path = path
+        self.speed = max(0.01, float(speed))
+        self.kind = kind
+        self._it: Optional[Iterator[tuple[float, int, bytes]]] = None
+        self._peek: Optional[tuple[float, int, bytes]] = None
+        self._wall_start = 0.0
+        self._log_start = 0.0
+        self.loops = 0
+
+    def _restart(self, wall: float) -> bool:
+        self._it = (r for r in iter_records(self.path) if r[1] == self.kind)
+        self._peek = next(self._it, None)
+        if self._peek is None:
+            return False
+        self._wall_start = wall
+        self._log_start = self._peek[0]
+        return True
+
+    def due_payloads(self, wall: float) -> list[dict]:
+        """All recorded payloads due at wall clock `wall`, oldest first (blocking, run in an executor).
+
+        At speed > 1 several records fall due per poll; none are skipped. Each
+        payload's `now` is set to the wall time it fell due, so age-based logic
+        sees live, increasing timestamps.
+        """
+        if self._peek is None and not self._restart(wall):
+            return []
+
+        target = self._log_start + (wall - self._wall_start) * self.speed
+        due = []
+        while self._peek is not None and self._peek[0] <= target:
+            due.append(self._peek)
+            self._peek = next(self._it, None)
+        if self._peek is None:
+            # end of log: loop, the next call starts from the beginning again
+            self.loops += 1
+
+        payloads = []
+        for ts, _kind, body in due:
+            payload = decode(body)
+            if isinstance(payload, dict) and "now" in payload:
+                payload["now"] = self._wall_start + (ts - self._log_start) / self.speed
+            payloads.append(payload)
+        return payloads
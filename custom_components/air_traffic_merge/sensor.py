@@ -1,303 +1,194 @@
 from __future__ import annotations
 
+import asyncio
 import time
-import aiohttp
-import async_timeout
 from datetime import timedelta
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
+    SIGNAL_FLIGHTS_UPDATED,
     CONF_ADSB_URL,
     CONF_SCAN_INTERVAL,
-    CONF_ENABLE_TRACKING,
-    CONF_TRACK_MODE,
-    CONF_TRACK_CALLSIGNS,
-    CONF_TRACK_REGISTRATIONS,
+    CONF_ADSB_SOURCE,
+    CONF_RECORD_SNAPSHOTS,
+    CONF_RECORD_MAX_MB,
+    CONF_REPLAY_FILE,
+    CONF_REPLAY_SPEED,
+    CONF_WORKER_MODE,
+    CONF_WORKER_RADIUS_KM,
+    ADSB_SOURCE_REPLAY,
     DEFAULT_SCAN_INTERVAL,
-    DEFAULT_ENABLE_TRACKING,
     DEFAULT_TRACK_MODE,
+    DEFAULT_RECORD_SNAPSHOTS,
+    DEFAULT_RECORD_MAX_MB,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_WORKER_MODE,
+    DEFAULT_WORKER_RADIUS_KM,
 )
-
-STORE_KEY = "latest"
-
-
-def _to_m(ft):
-    try:
-        return round(float(ft) * 0.3048)
-    except Exception:
-        return None
-
-
-def _to_kmh(kn):
-    try:
-        return round(float(kn) * 1.852)
-    except Exception:
-        return None
-
-
-def _safe_float(v):
-    try:
-        if v is None:
-            return None
-        return float(v)
-    except Exception:
-        return None
-
-
-def _split_csv(s: str) -> list[str]:
-    return [p.strip() for p in (s or "").split(",") if p.strip()]
-
-
-def _norm(s: str) -> str:
-    return (s or "").strip().upper()
-
-
-def _extract_callsign(ac: dict) -> str:
-    # readsb aircraft.json uses "flight" for callsign (often padded)
-    return (ac.get("flight") or "").strip()
-
-
-def _extract_registration(ac: dict) -> str:
-    # readsb aircraft.json uses "r" for registration
-    return (ac.get("r") or "").strip()
-
-
-def _compute_tracking(entry: ConfigEntry, aircraft: list[dict]) -> dict:
-    """Return matched sets and list (aircraft dicts)."""
-    enable = bool(
-        entry.options.get(
-            CONF_ENABLE_TRACKING,
-            entry.data.get(CONF_ENABLE_TRACKING, DEFAULT_ENABLE_TRACKING),
-        )
-    )
-    if not enable:
-        return {
-            "enabled": False,
-            "mode": DEFAULT_TRACK_MODE,
-            "want_callsigns": [],
-            "want_registrations": [],
-            "matched": [],
-            "matched_callsigns": [],
-            "matched_registrations": [],
-        }
-
-    mode = entry.options.get(CONF_TRACK_MODE, entry.data.get(CONF_TRACK_MODE, DEFAULT_TRACK_MODE))
-
-    want_callsigns = set(
-        _norm(x)
-        for x in _split_csv(entry.options.get(CONF_TRACK_CALLSIGNS, entry.data.get(CONF_TRACK_CALLSIGNS, "")))
-    )
-    want_regs = set(
-        _norm(x)
-        for x in _split_csv(entry.options.get(CONF_TRACK_REGISTRATIONS, entry.data.get(CONF_TRACK_REGISTRATIONS, "")))
-    )
-
-    matched = []
-    matched_callsigns = set()
-    matched_regs = set()
-
-    for ac in aircraft or []:
-        cs = _norm(_extract_callsign(ac))
-        reg = _norm(_extract_registration(ac))
-
-        cs_hit = cs and cs in want_callsigns
-        reg_hit = reg and reg in want_regs
-
-        if mode == "callsign" and cs_hit:
-            matched.append(ac)
-            matched_callsigns.add(cs)
-        elif mode == "registration" and reg_hit:
-            matched.append(ac)
-            matched_regs.add(reg)
-        elif mode == "both" and (cs_hit or reg_hit):
-            matched.append(ac)
-            if cs_hit:
-                matched_callsigns.add(cs)
-            if reg_hit:
-                matched_regs.add(reg)
-
-    return {
-        "enabled": True,
-        "mode": mode,
-        "want_callsigns": sorted(want_callsigns),
-        "want_registrations": sorted(want_regs),
-        "matched": matched,
-        "matched_callsigns": sorted(matched_callsigns),
-        "matched_registrations": sorted(matched_regs),
-    }
-
-
-def _build_flights_from_aircraft(entry: ConfigEntry, aircraft: list[dict], tracking: dict) -> list[dict]:
-    """Build the 'flights' list exactly like the Lovelace card expects."""
-    mode = tracking.get("mode", DEFAULT_TRACK_MODE)
-    want_callsigns = set(tracking.get("want_callsigns", []) or [])
-    want_regs = set(tracking.get("want_registrations", []) or [])
-
-    flights: list[dict] = []
-
-    for ac in aircraft or []:
-        callsign_raw = _extract_callsign(ac)
-        reg_raw = _extract_registration(ac)
-        hx = (ac.get("hex") or "").strip()
-
-        callsign = callsign_raw.strip()
-        reg = reg_raw.strip()
-
-        alt_m = _to_m(ac.get("alt_baro"))
-        spd_kmh = _to_kmh(ac.get("gs"))
-        dist_km = _safe_float(ac.get("r_dst"))
-        dir_deg = _safe_float(ac.get("r_dir"))
-
-        cs_norm = _norm(callsign)
-        reg_norm = _norm(reg)
-
-        cs_hit = cs_norm and cs_norm in want_callsigns
-        reg_hit = reg_norm and reg_norm in want_regs
-
-        is_tracked = False
-        tracked_by = ""
-        tracked_target = ""
-
-        if tracking.get("enabled"):
-            if mode == "callsign" and cs_hit:
-                is_tracked = True
-                tracked_by = "callsign"
-                tracked_target = cs_norm
-            elif mode == "registration" and reg_hit:
-                is_tracked = True
-                tracked_by = "registration"
-                tracked_target = reg_norm
-            elif mode == "both" and (cs_hit or reg_hit):
-                is_tracked = True
-                if reg_hit:
-                    tracked_by = "registration"
-                    tracked_target = reg_norm
-                else:
-                    tracked_by = "callsign"
-                    tracked_target = cs_norm
-
-        flights.append(
-            {
-                "registration": reg,
-                "hex": hx,
-                "callsign": callsign,
-                "airline": "",  # ADS-B usually doesn't provide airline name
-                "aircraft_model": (ac.get("t") or "").strip(),  # e.g. A320
-                "source": "ADSB",
-                "alt_m": alt_m,
-                "spd_kmh": spd_kmh,
-                "dist_km": dist_km,
-                "dir_deg": dir_deg,
-                "tracked": bool(is_tracked),
-                "tracked_target": tracked_target,
-                "tracked_by": tracked_by,
-            }
-        )
-
-    return flights
+from .data import EntryData, async_get_entry_data, restored_attributes
+from .pipeline import MergePipeline, _async_import, _compute_tracking
+from .source import FETCH_TIMEOUT, async_get_source
+from .state_cache import StateCache
+from .statistics import TrafficStatistics
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> None:
-    # Ensure store dict exists
-    hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {}).setdefault(STORE_KEY, {})
+    data = async_get_entry_data(hass, entry.entry_id)
 
-    merged = AirTrafficMergedSensor(hass, entry)
-    tracked = AirTrafficTrackedCountSensor(hass, entry)
+    merged = AirTrafficMergedSensor(hass, entry, data)
+    tracked = AirTrafficTrackedCountSensor(hass, entry, data)
+    stats = AirTrafficStatisticsSensor(hass, entry)
     merged.tracked_sensor = tracked
+    merged.statistics_sensor = stats
 
-    async_add_entities([merged, tracked])
-    await merged.async_start()
+    # merged starts polling once added (first refresh in the background, setup doesn't wait);
     # tracked reads from shared store and is refreshed by merged after each fetch
+    async_add_entities([merged, tracked, stats])
 
 
-class AirTrafficMergedSensor(SensorEntity):
+class AirTrafficMergedSensor(RestoreEntity, SensorEntity):
     _attr_name = "Air Traffic Merged"
     _attr_icon = "mdi:airplane"
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, data: EntryData) -> None:
         self.hass = hass
         self.entry = entry
+        self._data = data
         self._attr_unique_id = f"{entry.entry_id}_merged"
         self._attr_native_value = 0
         self._attr_extra_state_attributes = {}
         self._unsub_timer = None
+        self._pipeline = MergePipeline(hass, entry, data)
+        self._pipeline.stats_written = self._async_stats_written
+        self._cache = StateCache(hass, entry.entry_id)
+        self._first_refresh = None
+        # held while a refresh runs; timer ticks that find it held are skipped
+        self._update_lock = asyncio.Lock()
+        self._recorder = None
+        self._player = None
         self.tracked_sensor: AirTrafficTrackedCountSensor | None = None
+        self.statistics_sensor: AirTrafficStatisticsSensor | None = None
 
-    async def async_start(self):
-        interval = int(
+    def _interval(self) -> int:
+        return int(
             self.entry.options.get(
                 CONF_SCAN_INTERVAL,
                 self.entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
             )
         )
+
+    async def async_added_to_hass(self) -> None:
+        # show the last known picture until the first refresh is done
+        last = await self.async_get_last_state()
+        if last is not None:
+            try:
+                self._attr_native_value = int(last.state)
+            except ValueError:
+                pass
+            self._attr_extra_state_attributes = restored_attributes(last)
+        await self._async_restore_cache()
+        self.async_start()
+
+    async def _async_restore_cache(self) -> None:
+        """Put the last saved snapshot into the store, so target states don't flap after a restart."""
+        restored = await self._cache.async_load()
+        if restored is None:
+            return
+        self._pipeline.restore(restored)
+        if not self._data.latest:
+            self._data.latest = restored
+        # target sensors restore their own state, the cache only keeps present/hex
+        async_dispatcher_send(
+            self.hass, SIGNAL_FLIGHTS_UPDATED.format(self.entry.entry_id), restored["flights"], restored["last_update"]
+        )
+
+    @callback
+    def async_start(self) -> None:
         self._unsub_timer = async_track_time_interval(
             self.hass,
             self._async_update,
-            timedelta(seconds=interval),
+            timedelta(seconds=self._interval()),
+        )
+        self._first_refresh = self.hass.async_create_background_task(
+            self._async_first_refresh(), f"{DOMAIN} first refresh {self.entry.entry_id}"
         )
+
+    async def _async_first_refresh(self) -> None:
+        t0 = time.perf_counter()
         await self._async_update(None)
+        self._data.first_refresh_s = round(time.perf_counter() - t0, 3)
+
+    async def _async_fetch_worker(self, url: str) -> dict:
+        worker = await _async_import(self.hass, "worker")
+        tracking = _compute_tracking(self.entry, [])
+        return await worker.async_get_worker(self.hass).async_fetch(
+            url,
+            timeout=float(FETCH_TIMEOUT),
+            home_lat=self.hass.config.latitude,
+            home_lon=self.hass.config.longitude,
+            radius_km=float(self.entry.options.get(CONF_WORKER_RADIUS_KM, DEFAULT_WORKER_RADIUS_KM)),
+            callsigns=tracking["want_callsigns"],
+            registrations=tracking["want_registrations"],
+        )
+
+    async def _async_record(self, raw: bytes) -> None:
+        """Append the raw payload to the snapshot log if recording is enabled (non-blocking)."""
+        opts = self.entry.options
+        if not opts.get(CONF_RECORD_SNAPSHOTS, DEFAULT_RECORD_SNAPSHOTS):
+            self._recorder = None
+            return
+        max_bytes = int(opts.get(CONF_RECORD_MAX_MB, DEFAULT_RECORD_MAX_MB)) * 1024 * 1024
+        replay = await _async_import(self.hass, "replay")
+        if self._recorder is None:
+            self._recorder = replay.SnapshotRecorder(
+                self.hass.config.path(DOMAIN, f"snapshots_{self.entry.entry_id}.rec"), max_bytes
+            )
+        self._recorder.max_bytes = max_bytes
+        self.hass.async_add_executor_job(self._recorder.append, time.time(), replay.KIND_ADSB, raw)
 
     async def _async_update(self, now):
+        if self._update_lock.locked():
+            # the previous refresh (or the first one, started in the background) is still running
+            return
+        async with self._update_lock:
+            await self._async_refresh()
+
+    async def _async_refresh(self) -> None:
         url = self.entry.data.get(CONF_ADSB_URL)
-        if not url:
+        replay_mode = self.entry.data.get(CONF_ADSB_SOURCE) == ADSB_SOURCE_REPLAY
+        if not url and not replay_mode:
             # no URL configured (ADS-B URL mode required for now)
             return
 
         try:
-            async with async_timeout.timeout(10):
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as resp:
-                        data = await resp.json()
-
-            aircraft = data.get("aircraft", []) or []
-
-            tracking = _compute_tracking(self.entry, aircraft)
-
-            # Build flights for the Lovelace card
-            flights = _build_flights_from_aircraft(self.entry, aircraft, tracking)
-
-            # Store for other entities/platforms
-            self.hass.data[DOMAIN][self.entry.entry_id][STORE_KEY] = {
-                "aircraft": aircraft,
-                "flights": flights,
-                "tracking": tracking,
-                "raw": {"now": data.get("now"), "messages": data.get("messages")},
-            }
-
-            # Sensor state = number of flights
-            self._attr_native_value = len(flights)
-
-            # Card expects: attributes.flights + attributes.last_update
-            tracked_active = tracking.get("matched_callsigns") or tracking.get("matched_registrations") or []
-            tracked_active_count = len(tracking.get("matched", []) or [])
-
-            self._attr_extra_state_attributes = {
-                "last_update": int(time.time()),
-                "flights": flights,
-
-                # optional debug/raw
-                "aircraft": aircraft,
-                "messages": data.get("messages"),
-                "now": data.get("now"),
-
-                # tracking info (used by card chips if status_entity is provided;
-                # still useful for debug)
-                "tracking_enabled": bool(tracking.get("enabled", False)),
-                "tracked_active_count": tracked_active_count,
-                "tracked_active": tracked_active,
-                "matched_callsigns": tracking.get("matched_callsigns", []),
-                "matched_registrations": tracking.get("matched_registrations", []),
-            }
-
-            self.async_write_ha_state()
-            if self.tracked_sensor is not None:
-                self.tracked_sensor.refresh_from_store(write_state=True)
-
+            if replay_mode:
+                if self._player is None:
+                    replay = await _async_import(self.hass, "replay")
+                    self._player = replay.SnapshotPlayer(
+                        self.hass.config.path(self.entry.data.get(CONF_REPLAY_FILE, "")),
+                        float(self.entry.data.get(CONF_REPLAY_SPEED, DEFAULT_REPLAY_SPEED)),
+                    )
+                # every record due on the replay clock, in order (several per poll above 1x speed)
+                payloads = await self.hass.async_add_executor_job(self._player.due_payloads, time.time())
+            elif self.entry.options.get(CONF_WORKER_MODE, DEFAULT_WORKER_MODE):
+                # huge feeds: fetch, decode and filter in a worker process, only the result comes back
+                payloads = [await self._async_fetch_worker(url)]
+            else:
+                # shared per URL: entries on the same receiver cost one fetch and one parse
+                raw, data = await async_get_source(self.hass, url, self.entry.entry_id).async_get(max(1.0, self._interval() - 1))
+                await self._async_record(raw)
+                payloads = [data]
+
+            for data in payloads:
+                await self._async_process(data)
         except Exception as e:
             self._attr_extra_state_attributes = {
                 "last_update": int(time.time()),
@@ -305,28 +196,58 @@ class AirTrafficMergedSensor(SensorEntity):
             }
             self.async_write_ha_state()
 
+    async def _async_process(self, data: dict) -> None:
+        """Run one aircraft.json payload through the pipeline and publish the result."""
+        store, attrs = await self._pipeline.async_process(data)
+        self._cache.async_schedule_save(store)
+
+        # Sensor state = number of flights
+        self._attr_native_value = len(store["flights"])
+        self._attr_extra_state_attributes = attrs
+
+        self.async_write_ha_state()
+        if self.tracked_sensor is not None:
+            self.tracked_sensor.refresh_from_store(write_state=True)
+
+    async def _async_stats_written(self) -> None:
+        if self.statistics_sensor is not None:
+            await self.statistics_sensor.async_refresh_from(self._pipeline.stats)
+
     async def async_will_remove_from_hass(self):
         if self._unsub_timer:
             self._unsub_timer()
+        if self._first_refresh is not None and not self._first_refresh.done():
+            self._first_refresh.cancel()
+        await self._cache.async_flush()
+        await self._pipeline.async_shutdown()
 
 
-class AirTrafficTrackedCountSensor(SensorEntity):
+class AirTrafficTrackedCountSensor(RestoreEntity, SensorEntity):
     _attr_name = "Air Traffic Tracked Count"
     _attr_icon = "mdi:radar"
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, data: EntryData) -> None:
         self.hass = hass
         self.entry = entry
+        self._data = data
         self._attr_unique_id = f"{entry.entry_id}_tracked_count"
         self._attr_native_value = 0
         self._attr_extra_state_attributes = {}
 
+    async def async_added_to_hass(self) -> None:
+        last = await self.async_get_last_state()
+        if last is not None:
+            try:
+                self._attr_native_value = int(last.state)
+            except ValueError:
+                pass
+            self._attr_extra_state_attributes = restored_attributes(last)
+
     def refresh_from_store(self, *, write_state: bool = False) -> None:
-        store = (
-            self.hass.data.get(DOMAIN, {})
-            .get(self.entry.entry_id, {})
-            .get(STORE_KEY, {})
-        )
+        store = self._data.latest
+        if "tracking" not in store:
+            # no refresh yet, keep the restored state
+            return
         tracking = store.get("tracking", {}) or {}
         matched = tracking.get("matched", []) or []
 
@@ -337,9 +258,65 @@ class AirTrafficTrackedCountSensor(SensorEntity):
             "matched_callsigns": tracking.get("matched_callsigns", []),
             "matched_registrations": tracking.get("matched_registrations", []),
             "matched_aircraft": matched,
+            "approaches": tracking.get("approaches", []),
         }
         if write_state:
             self.async_write_ha_state()
 
     async def async_update(self):
         self.refresh_from_store()
+
+
+class AirTrafficStatisticsSensor(RestoreEntity, SensorEntity):
+    """Unique aircraft today, plus monthly aggregates from the statistics file."""
+
+    _attr_name = "Air Traffic Statistics"
+    _attr_icon = "mdi:chart-bar"
+    _attr_native_unit_of_measurement = "aircraft"
+    # resets every day at local midnight, announced through last_reset
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self.hass = hass
+        self.entry = entry
+        self._attr_unique_id = f"{entry.entry_id}_statistics"
+        self._attr_native_value = None
+        self._attr_extra_state_attributes = {}
+
+    async def async_added_to_hass(self) -> None:
+        last = await self.async_get_last_state()
+        if last is not None:
+            try:
+                self._attr_native_value = int(last.state)
+            except ValueError:
+                pass
+            self._attr_extra_state_attributes = restored_attributes(last)
+            self._attr_last_reset = dt_util.parse_datetime(last.attributes.get("last_reset") or "")
+
+    async def async_refresh_from(self, stats: TrafficStatistics) -> None:
+        today = dt_util.start_of_local_day()
+        month = today.replace(day=1)
+        try:
+            day_summary = await self.hass.async_add_executor_job(stats.summary, today)
+            month_summary = await self.hass.async_add_executor_job(stats.summary, month)
+            month_totals = await self.hass.async_add_executor_job(stats.month_totals)
+        except Exception as e:
+            self._attr_extra_state_attributes = {"error": str(e)}
+        else:
+            self._attr_native_value = day_summary["unique_aircraft"]
+            self._attr_last_reset = today
+            self._attr_extra_state_attributes = {
+                "today_max_range_km": day_summary["max_range_km"],
+                "today_busiest_hour": day_summary["busiest_hour"],
+                "month_unique_aircraft": month_summary["unique_aircraft"],
+                "month_max_range_km": month_summary["max_range_km"],
+                "month_busiest_hour": month_summary["busiest_hour"],
+                "month_busiest_hour_aircraft": month_summary["busiest_hour_aircraft"],
+                "month_by_type": month_summary["by_type"],
+                "month_by_airline": month_summary["by_airline"],
+                "month_by_source": month_summary["by_source"],
+                "previous_months_unique_aircraft": month_totals,
+            }
+        if self.entity_id:
+            self.async_write_ha_state()
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+# A pass ends when the target has not been seen for this long
+PASS_TIMEOUT = 300
+QUEUE_SIZE = 1000
+BATCH_SIZE = 100
+
+_SCHEMA = """CREATE TABLE IF NOT EXISTS sightings (
+    target TEXT NOT NULL,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,
+    hex TEXT,
+    callsign TEXT,
+    registration TEXT,
+    min_dist_km REAL,
+    max_alt_m REAL,
+    sources TEXT,
+    PRIMARY KEY (target, first_seen)
+)"""
+
+_COLUMNS = (
+    "target",
+    "first_seen",
+    "last_seen",
+    "hex",
+    "callsign",
+    "registration",
+    "min_dist_km",
+    "max_alt_m",
+    "sources",
+)
+
+
+@dataclass
+class Sighting:
+    target: str
+    first_seen: float
+    last_seen: float
+    hex: str = ""
+    callsign: str = ""
+    registration: str = ""
+    min_dist_km: Optional[float] = None
+    max_alt_m: Optional[float] = None
+    sources: set[str] = field(default_factory=set)
+
+    def update(self, f: dict, now: float) -> None:
+        self.last_seen = now
+        self.hex = f.get("hex") or self.hex
+        self.callsign = f.get("callsign") or self.callsign
+        self.registration = f.get("registration") or self.registration
+        dist = f.get("dist_km")
+        if dist is not None and (self.min_dist_km is None or dist < self.min_dist_km):
+            self.min_dist_km = dist
+        alt = f.get("alt_m")
+        if alt is not None and (self.max_alt_m is None or alt > self.max_alt_m):
+            self.max_alt_m = alt
+        if f.get("source"):
+            self.sources.add(f["source"])
+
+    def row(self) -> tuple:
+        return (
+            self.target,
+            int(self.first_seen),
+            int(self.last_seen),
+            self.hex,
+            self.callsign,
+            self.registration,
+            self.min_dist_km,
+            self.max_alt_m,
+            ",".join(sorted(self.sources)),
+        )
+
+
+class SightingLog:
+    """Passes of tracked targets, persisted through a queue drained in batches off the event loop."""
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        self.hass = hass
+        self.path = path
+        self._active: dict[str, Sighting] = {}
+        self._queue: asyncio.Queue[Optional[tuple]] = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._task: Optional[asyncio.Task] = None
+        self._dropped = 0
+
+    @callback
+    def async_start(self) -> None:
+        self._task = self.hass.async_create_background_task(self._async_writer(), f"air_traffic_merge sightings {self.path}")
+
+    async def async_stop(self) -> None:
+        """Write open passes and wait for the queue to drain."""
+        for s in self._active.values():
+            self._enqueue(s.row())
+        self._active.clear()
+        if self._task is None:
+            return
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    @callback
+    def update(self, flights: list[dict], now: float) -> None:
+        """Record tracked flights of one poll. Never blocks: rows are only queued."""
+        for f in flights:
+            target = f.get("tracked_target")
+            if not f.get("tracked") or not target:
+                continue
+            s = self._active.get(target)
+            if s is None:
+                s = self._active[target] = Sighting(target=target, first_seen=now, last_seen=now)
+                s.update(f, now)
+                # write the start right away, the pass is upserted again when it ends
+                self._enqueue(s.row())
+            else:
+                s.update(f, now)
+
+        ended = [t for t, s in self._active.items() if now - s.last_seen > PASS_TIMEOUT]
+        for t in ended:
+            self._enqueue(self._active.pop(t).row())
+
+    async def async_export_csv(self, path: str) -> int:
+        """Export including the passes still open: their rows are written first."""
+        for s in self._active.values():
+            self._enqueue(s.row())
+        await self._queue.join()
+        return await self.hass.async_add_executor_job(self.export_csv, path)
+
+    def _enqueue(self, row: tuple) -> None:
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self._dropped += 1
+            if self._dropped == 1:
+                _LOGGER.warning("Sighting log queue full, dropping rows for %s", self.path)
+
+    async def _async_writer(self) -> None:
+        while True:
+            row = await self._queue.get()
+            batch = [] if row is None else [row]
+            stop = row is None
+            while not stop and len(batch) < BATCH_SIZE:
+                try:
+                    row = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if row is None:
+                    stop = True
+                else:
+                    batch.append(row)
+            if batch:
+                await self.hass.async_add_executor_job(self._write, batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    # --- executor side -------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute(_SCHEMA)
+        return conn
+
+    def _write(self, batch: list[tuple]) -> None:
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO sightings VALUES ({', '.join('?' * len(_COLUMNS))})",
+                        batch,
+                    )
+            finally:
+                conn.close()
+        except Exception as err:
+            _LOGGER.warning("Writing sightings to %s failed: %s", self.path, err)
+
+    def export_csv(self, path: str) -> int:
+        """Write all sightings (oldest first) to a CSV file, returns the row count."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM sightings ORDER BY first_seen").fetchall()
+        finally:
+            conn.close()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            w = csv.writer(fh)
+            w.writerow(_COLUMNS)
+            for r in rows:
+                r = list(r)
+                for i in (1, 2):
+                    r[i] = datetime.fromtimestamp(r[i], timezone.utc).isoformat()
+                w.writerow(r)
+        return len(rows)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DOMAIN
+
+SOURCES_KEY = "sources"
+FETCH_TIMEOUT = 10
+
+
+def normalize_adsb_url(url: str) -> str:
+    """Base URL of a readsb/tar1090 instance -> its aircraft.json URL."""
+    u = (url or "").strip()
+    if not u:
+        return u
+    if not (u.startswith("http://") or u.startswith("https://")):
+        return u
+    if "aircraft.json" in u:
+        return u
+    u = u.rstrip("/")
+    return f"{u}/data/aircraft.json"
+
+
+class AdsbSource:
+    """One aircraft.json URL shared by all entries: one fetch at a time, parsed once.
+
+    The parsed snapshot is shared between entries and must be treated as read-only.
+    """
+
+    def __init__(self, hass: HomeAssistant, url: str) -> None:
+        self.hass = hass
+        self.url = url
+        self._snapshot: Optional[tuple[float, bytes, dict[str, Any]]] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self.fetch_count = 0
+        # entry ids using this source
+        self.users: set[str] = set()
+
+    async def _async_fetch(self) -> tuple[float, bytes, dict[str, Any]]:
+        session = async_get_clientsession(self.hass)
+        async with asyncio.timeout(FETCH_TIMEOUT):
+            async with session.get(self.url) as resp:
+                resp.raise_for_status()
+                raw = await resp.read()
+        data = json.loads(raw)
+        self.fetch_count += 1
+        self._snapshot = (time.monotonic(), raw, data)
+        return self._snapshot
+
+    async def async_get(self, max_age: float) -> tuple[bytes, dict[str, Any]]:
+        """Snapshot no older than `max_age` seconds; concurrent callers share one request."""
+        snap = self._snapshot
+        if snap is not None and time.monotonic() - snap[0] < max_age:
+            return snap[1], snap[2]
+
+        if self._inflight is None:
+            self._inflight = self.hass.async_create_task(self._async_fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        _ts, raw, data = await asyncio.shield(self._inflight)
+        return raw, data
+
+    def _clear_inflight(self, _task: asyncio.Task) -> None:
+        self._inflight = None
+
+
+@callback
+def async_get_source(hass: HomeAssistant, url: str, entry_id: str) -> AdsbSource:
+    """Shared source for a (normalized) aircraft.json URL, held by `entry_id` until released."""
+    key = normalize_adsb_url(url)
+    sources = hass.data.setdefault(DOMAIN, {}).setdefault(SOURCES_KEY, {})
+    src = sources.get(key)
+    if src is None:
+        src = sources[key] = AdsbSource(hass, key)
+    src.users.add(entry_id)
+    return src
+
+
+@callback
+def async_release_sources(hass: HomeAssistant, entry_id: str) -> None:
+    """Drop the entry from its sources; sources nobody uses any more are removed."""
+    sources = hass.data.get(DOMAIN, {}).get(SOURCES_KEY, {})
+    for key, src in list(sources.items()):
+        src.users.discard(entry_id)
+        if not src.users:
+            del sources[key]
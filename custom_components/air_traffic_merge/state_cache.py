@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+# At most one write per SAVE_DELAY seconds; Store writes pending data on shutdown
+SAVE_DELAY = 60
+# Older flights are not shown again after a restart (targets are always restored)
+MAX_FLIGHTS_AGE = 600
+
+# Flight fields not worth persisting (recomputed on the next poll)
+_SKIP_FIELDS = {"trail"}
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.state_{entry_id}"
+
+
+def pack_rows(rows: list[dict]) -> dict[str, list]:
+    """Column layout: field names once, then one value list per row (None = missing)."""
+    fields: dict[str, int] = {}
+    for r in rows:
+        for k in r:
+            if k not in fields and k not in _SKIP_FIELDS:
+                fields[k] = len(fields)
+    names = list(fields)
+    return {"fields": names, "rows": [[r.get(k) for k in names] for r in rows]}
+
+
+def unpack_rows(packed: dict[str, list]) -> list[dict]:
+    names = packed.get("fields") or []
+    return [{k: v for k, v in zip(names, row) if v is not None} for row in packed.get("rows") or []]
+
+
+def _restore_targets(saved: dict[str, Any], last_update: int) -> dict[str, dict]:
+    """target -> hex of the present targets back to minimal target states."""
+    targets = {}
+    for target, hx in saved.items():
+        if isinstance(hx, dict):
+            # written before only the hex was kept
+            if not hx.get("present"):
+                continue
+            hx = hx.get("hex", "")
+        targets[target] = {"present": True, "hex": hx or "", "last_seen": last_update}
+    return targets
+
+
+class StateCache:
+    """Last merged flights and present targets of an entry in .storage, saved debounced.
+
+    Only what the entities' own restore state cannot give back is kept: the
+    flights (column-packed) and target -> hex of the present targets.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, _storage_key(entry_id), private=True)
+        self._latest: Optional[dict[str, Any]] = None
+        self._pending = False
+
+    async def async_load(self) -> Optional[dict[str, Any]]:
+        """Restored store dict (`flights` empty when too old, no `tracking`), or None."""
+        data = await self._store.async_load()
+        if not isinstance(data, dict):
+            return None
+        last_update = int(data.get("last_update") or 0)
+        fresh = time.time() - last_update <= MAX_FLIGHTS_AGE
+        return {
+            "aircraft": [],
+            "flights": unpack_rows(data.get("flights") or {}) if fresh else [],
+            "targets": _restore_targets(data.get("targets") or {}, last_update),
+            "last_update": last_update,
+            "generation": int(data.get("generation") or 0),
+            "raw": {},
+            "restored": True,
+        }
+
+    @callback
+    def async_schedule_save(self, store: dict[str, Any]) -> None:
+        # not rescheduled while a save is pending, so polls faster than SAVE_DELAY still get saved
+        self._latest = store
+        if not self._pending:
+            self._pending = True
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write a pending save now (entry unload/reload)."""
+        if self._pending:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._pending = False
+        store = self._latest or {}
+        return {
+            "flights": pack_rows(store.get("flights") or []),
+            "targets": {t: s.get("hex", "") for t, s in (store.get("targets") or {}).items() if s.get("present")},
+            "last_update": store.get("last_update"),
+            "generation": store.get("generation"),
+        }
+
+
+async def async_remove_cache(hass: HomeAssistant, entry_id: str) -> None:
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
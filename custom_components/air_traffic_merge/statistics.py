@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime, tzinfo
+from typing import Any, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Aggregation bucket and how often the open bucket is written to disk
+STATS_INTERVAL = 3600
+FLUSH_INTERVAL = 300
+TOP_N = 10
+# Closed months listed by month_totals()
+MONTHS_KEPT = 12
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS stats_hour (
+        start INTEGER PRIMARY KEY,
+        unique_aircraft INTEGER NOT NULL,
+        max_range_km REAL,
+        polls INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS stats_count (
+        start INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (start, kind, key)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS stats_seen (
+        day TEXT NOT NULL,
+        hex TEXT NOT NULL,
+        PRIMARY KEY (day, hex)
+    ) WITHOUT ROWID""",
+    # unique aircraft of closed months, kept when their stats_seen rows are pruned
+    """CREATE TABLE IF NOT EXISTS stats_month (
+        month TEXT PRIMARY KEY,
+        unique_aircraft INTEGER NOT NULL
+    )""",
+)
+
+
+def _month_start(day: str) -> str:
+    """First day of the month of a "%Y-%m-%d" day."""
+    return f"{day[:8]}01"
+
+
+class _Bucket:
+    __slots__ = ("start", "end", "day", "aircraft", "max_range_km", "polls")
+
+    def __init__(self, now: float, tz: Optional[tzinfo]) -> None:
+        # local hour, so the busiest hour matches the wall clock in every time zone
+        hour = datetime.fromtimestamp(now, tz).replace(minute=0, second=0, microsecond=0)
+        self.start = int(hour.timestamp())
+        self.end = self.start + STATS_INTERVAL
+        self.day = hour.strftime("%Y-%m-%d")
+        # key -> (type, airline, source) as first seen in this bucket
+        self.aircraft: dict[str, tuple[str, str, str]] = {}
+        self.max_range_km: Optional[float] = None
+        self.polls = 0
+
+    def rows(self) -> dict[str, Any]:
+        counts: dict[str, Counter] = {"type": Counter(), "airline": Counter(), "source": Counter()}
+        for typ, airline, source in self.aircraft.values():
+            if typ:
+                counts["type"][typ] += 1
+            if airline:
+                counts["airline"][airline] += 1
+            if source:
+                counts["source"][source] += 1
+        return {
+            "hour": (self.start, len(self.aircraft), self.max_range_km, self.polls),
+            "counts": [(self.start, kind, key, n) for kind, c in counts.items() for key, n in c.items()],
+            "seen": [(self.day, key) for key in self.aircraft],
+        }
+
+
+class TrafficStatistics:
+    """Hourly traffic aggregates, kept in memory and written to SQLite in batches."""
+
+    def __init__(self, path: str, tz: Optional[tzinfo] = None) -> None:
+        self.path = path
+        self._tz = tz
+        self._bucket: Optional[_Bucket] = None
+        self._pending: list[dict[str, Any]] = []
+        self._last_flush = 0.0  # first poll writes immediately
+        # stats_seen only serves the unique counts of today and this month; older
+        # months are totalled into stats_month and deleted with the next write after a day starts
+        self._prune_before: Optional[str] = None
+
+    def add(self, flights: list[dict], now: float) -> None:
+        if self._bucket is None or not self._bucket.start <= now < self._bucket.end:
+            bucket = _Bucket(now, self._tz)
+            if self._bucket is not None:
+                self._pending.append(self._bucket.rows())
+            if self._bucket is None or self._bucket.day != bucket.day:
+                self._prune_before = _month_start(bucket.day)
+            self._bucket = bucket
+
+        b = self._bucket
+        b.polls += 1
+        for f in flights:
+            key = f.get("hex") or f.get("registration")
+            if not key:
+                continue
+            if key not in b.aircraft:
+                b.aircraft[key] = (f.get("aircraft_model") or "", f.get("airline") or "", f.get("source") or "")
+            dist = f.get("dist_km")
+            if dist is not None and (b.max_range_km is None or dist > b.max_range_km):
+                b.max_range_km = dist
+
+    def flush_due(self, now: float) -> bool:
+        return bool(self._pending) or now - self._last_flush >= FLUSH_INTERVAL
+
+    def take_batch(self, now: float) -> list[dict[str, Any]]:
+        """Closed buckets plus a snapshot of the open one (upserted, so rewriting is safe)."""
+        batch = self._pending
+        self._pending = []
+        if self._bucket is not None:
+            batch.append(self._bucket.rows())
+        if self._prune_before is not None and batch:
+            batch[-1]["prune_seen_before"] = self._prune_before
+            self._prune_before = None
+        self._last_flush = now
+        return batch
+
+    # --- executor side -------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+        return conn
+
+    def write(self, batch: list[dict[str, Any]]) -> None:
+        """Write a batch in one transaction (blocking, run in an executor)."""
+        if not batch:
+            return
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    for rows in batch:
+                        conn.execute("INSERT OR REPLACE INTO stats_hour VALUES (?, ?, ?, ?)", rows["hour"])
+                        conn.execute("DELETE FROM stats_count WHERE start = ?", (rows["hour"][0],))
+                        conn.executemany("INSERT INTO stats_count VALUES (?, ?, ?, ?)", rows["counts"])
+                        conn.executemany("INSERT OR IGNORE INTO stats_seen VALUES (?, ?)", rows["seen"])
+                        if "prune_seen_before" in rows:
+                            before = rows["prune_seen_before"]
+                            conn.execute(
+                                "INSERT OR REPLACE INTO stats_month "
+                                "SELECT substr(day, 1, 7), COUNT(DISTINCT hex) FROM stats_seen "
+                                "WHERE day < ? GROUP BY substr(day, 1, 7)",
+                                (before,),
+                            )
+                            conn.execute("DELETE FROM stats_seen WHERE day < ?", (before,))
+            finally:
+                conn.close()
+        except Exception as err:
+            _LOGGER.warning("Writing traffic statistics to %s failed: %s", self.path, err)
+
+    def summary(self, since: datetime) -> dict[str, Any]:
+        """Aggregates since `since` (aware, same time zone as the buckets), blocking, run in an executor."""
+        start = int(since.timestamp())
+        day = since.strftime("%Y-%m-%d")
+        conn = self._connect()
+        try:
+            unique = conn.execute("SELECT COUNT(DISTINCT hex) FROM stats_seen WHERE day >= ?", (day,)).fetchone()[0]
+            max_range = conn.execute("SELECT MAX(max_range_km) FROM stats_hour WHERE start >= ?", (start,)).fetchone()[0]
+            busiest = conn.execute(
+                "SELECT start, unique_aircraft FROM stats_hour WHERE start >= ? "
+                "ORDER BY unique_aircraft DESC, start DESC LIMIT 1",
+                (start,),
+            ).fetchone()
+            top: dict[str, dict[str, int]] = {}
+            for kind in ("type", "airline", "source"):
+                top[kind] = {
+                    key: n
+                    for key, n in conn.execute(
+                        "SELECT key, SUM(count) AS n FROM stats_count WHERE start >= ? AND kind = ? "
+                        "GROUP BY key ORDER BY n DESC LIMIT ?",
+                        (start, kind, TOP_N),
+                    )
+                }
+        finally:
+            conn.close()
+
+        return {
+            "unique_aircraft": unique,
+            "max_range_km": max_range,
+            "busiest_hour": datetime.fromtimestamp(busiest[0], self._tz).isoformat() if busiest else None,
+            "busiest_hour_aircraft": busiest[1] if busiest else 0,
+            # aircraft-hours: an aircraft seen in three hours counts three times
+            "by_type": top["type"],
+            "by_airline": top["airline"],
+            "by_source": top["source"],
+        }
+
+    def month_totals(self) -> dict[str, int]:
+        """Unique aircraft of the last closed months ("%Y-%m" -> count), blocking, run in an executor."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT month, unique_aircraft FROM stats_month ORDER BY month DESC LIMIT ?", (MONTHS_KEPT,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN, SIGNAL_FLIGHTS_UPDATED
+from .coverage import Coverage
+from .data import async_get_entry_data
+
+
+@callback
+def async_register(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, ws_subscribe)
+    websocket_api.async_register_command(hass, ws_coverage)
+    websocket_api.async_register_command(hass, ws_coverage_reset)
+
+
+def _flight_key(f: dict) -> str:
+    return f.get("hex") or f.get("registration") or f.get("callsign") or ""
+
+
+def _select(flights: list[dict], radius_km: float | None, tracked_only: bool, max_items: int | None) -> dict[str, dict]:
+    """Filtered flights keyed by hex, tracked first, then nearest (like the card sorts)."""
+    picked = []
+    for f in flights:
+        if tracked_only and not f.get("tracked"):
+            continue
+        dist = f.get("dist_km")
+        if radius_km is not None and not f.get("tracked") and (dist is None or dist > radius_km):
+            continue
+        picked.append(f)
+
+    if max_items is not None and len(picked) > max_items:
+        picked.sort(key=lambda f: (0 if f.get("tracked") else 1, f.get("dist_km") if f.get("dist_km") is not None else 9999))
+        picked = picked[:max_items]
+
+    return {k: f for f in picked if (k := _flight_key(f))}
+
+
+def _resolve_entry_id(hass: HomeAssistant, msg: dict) -> str | None:
+    if msg.get("entry_id"):
+        return msg["entry_id"]
+    if msg.get("entity_id"):
+        ent = er.async_get(hass).async_get(msg["entity_id"])
+        return ent.config_entry_id if ent else None
+    entries = hass.config_entries.async_entries(DOMAIN)
+    return entries[0].entry_id if len(entries) == 1 else None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "air_traffic_merge/subscribe",
+        vol.Optional("entry_id"): str,
+        vol.Optional("entity_id"): str,
+        vol.Optional("max_items"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional("radius_km"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("tracked_only", default=False): bool,
+    }
+)
+@callback
+def ws_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Send the current flights once, then only added/changed/removed flights keyed by hex."""
+    entry_id = _resolve_entry_id(hass, msg)
+    if not entry_id:
+        connection.send_error(msg["id"], "entry_not_found", "Specify entry_id or entity_id")
+        return
+
+    radius_km = msg.get("radius_km")
+    tracked_only = msg["tracked_only"]
+    max_items = msg.get("max_items")
+
+    data = async_get_entry_data(hass, entry_id)
+    store = data.latest if data is not None else {}
+    current = _select(store.get("flights", []) or [], radius_km, tracked_only, max_items)
+
+    @callback
+    def _forward(flights: list[dict], last_update: int) -> None:
+        nonlocal current
+        new = _select(flights, radius_km, tracked_only, max_items)
+        added = [f for k, f in new.items() if k not in current]
+        changed = [f for k, f in new.items() if k in current and current[k] != f]
+        removed = [k for k in current if k not in new]
+        current = new
+        if added or changed or removed:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"],
+                    {"added": added, "changed": changed, "removed": removed, "last_update": last_update},
+                )
+            )
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass, SIGNAL_FLIGHTS_UPDATED.format(entry_id), _forward
+    )
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(
+            msg["id"],
+            {"snapshot": list(current.values()), "last_update": store.get("last_update")},
+        )
+    )
+
+
+def _coverage(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> Coverage | None:
+    data = async_get_entry_data(hass, _resolve_entry_id(hass, msg) or "")
+    if data is None:
+        connection.send_error(msg["id"], "entry_not_found", "Specify entry_id or entity_id")
+        return None
+    return data.coverage
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "air_traffic_merge/coverage",
+        vol.Optional("entry_id"): str,
+        vol.Optional("entity_id"): str,
+    }
+)
+@callback
+def ws_coverage(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Max range per bearing sector and altitude band (`max_range_km[band][sector]`)."""
+    coverage = _coverage(hass, connection, msg)
+    if coverage is not None:
+        connection.send_result(msg["id"], coverage.map.as_dict())
+
+
+@websocket_api.require_admin
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "air_traffic_merge/coverage_reset",
+        vol.Optional("entry_id"): str,
+        vol.Optional("entity_id"): str,
+    }
+)
+@callback
+def ws_coverage_reset(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Start a new coverage map, e.g. after changing the antenna."""
+    coverage = _coverage(hass, connection, msg)
+    if coverage is not None:
+        coverage.reset()
+        connection.send_result(msg["id"])
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Any, Callable, Optional
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+WORKER_KEY = "worker"
+# Seconds for fetch + decode + filter in the worker before it is restarted
+WORKER_TIMEOUT = 30
+# Seconds a worker gets to exit after its stdin is closed
+SHUTDOWN_TIMEOUT = 5
+# Largest reply line read from the worker (radius 0 keeps the whole feed)
+READ_LIMIT = 64 * 1024 * 1024
+# Larger replies are decoded in the executor
+INLINE_DECODE_BYTES = 256 * 1024
+
+# Runs as a standalone script, see feed_filter.py
+_SCRIPT = os.path.join(os.path.dirname(__file__), "feed_filter.py")
+
+
+class FeedWorker:
+    """One worker process for fetch + decode + filter, recreated after a crash or hang.
+
+    Only the fetch, decode and radius/tracking filter run in the worker; the
+    merge of the filtered aircraft stays on the event loop like for any feed.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        # one request at a time on the worker's stdin/stdout
+        self._lock = asyncio.Lock()
+        self._unsub_stop: Optional[Callable[[], None]] = None
+        self.restarts = 0
+
+    async def _async_get_proc(self) -> asyncio.subprocess.Process:
+        if self._proc is None or self._proc.returncode is not None:
+            self._proc = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-I",
+                _SCRIPT,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                limit=READ_LIMIT,
+            )
+        return self._proc
+
+    async def _async_kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        self.restarts += 1
+        if proc.returncode is None:
+            proc.kill()
+        await proc.wait()
+
+    async def async_fetch(self, url: str, **kwargs: Any) -> dict[str, Any]:
+        request = json.dumps({"url": url, **kwargs}, separators=(",", ":")).encode("utf-8") + b"\n"
+        async with self._lock:
+            proc = await self._async_get_proc()
+            try:
+                async with asyncio.timeout(WORKER_TIMEOUT):
+                    proc.stdin.write(request)
+                    await proc.stdin.drain()
+                    line = await proc.stdout.readline()
+                if not line:
+                    raise ConnectionResetError("worker exited")
+            except BaseException as err:
+                # also on cancellation: a reply still pending in the pipe would
+                # otherwise be read as the answer to the next request
+                if not isinstance(err, asyncio.CancelledError):
+                    _LOGGER.warning("Feed worker for %s failed (%s), restarting it", url, type(err).__name__)
+                await self._async_kill()
+                raise
+        # with radius 0 the reply holds the whole feed, decode it off the event loop
+        if len(line) > INLINE_DECODE_BYTES:
+            reply = await self.hass.async_add_executor_job(json.loads, line)
+        else:
+            reply = json.loads(line)
+        if "error" in reply:
+            raise HomeAssistantError(f"Feed worker for {url}: {reply['error']}")
+        return reply
+
+    async def async_shutdown(self, _event: Event | None = None) -> None:
+        """Close the worker's stdin so it exits, kill it if it does not."""
+        if self._unsub_stop is not None:
+            if _event is None:
+                self._unsub_stop()
+            self._unsub_stop = None
+        async with self._lock:
+            proc, self._proc = self._proc, None
+            if proc is None or proc.returncode is not None:
+                return
+            proc.stdin.close()
+            try:
+                async with asyncio.timeout(SHUTDOWN_TIMEOUT):
+                    await proc.wait()
+            except TimeoutError:
+                proc.kill()
+                await proc.wait()
+
+
+@callback
+def async_get_worker(hass: HomeAssistant) -> FeedWorker:
+    """Shared feed worker, shut down with Home Assistant or the last entry."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    worker = domain_data.get(WORKER_KEY)
+    if worker is None:
+        worker = domain_data[WORKER_KEY] = FeedWorker(hass)
+        worker._unsub_stop = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, worker.async_shutdown)
+    return worker
+
+
+async def async_release_worker(hass: HomeAssistant) -> None:
+    """Stop the shared worker (last entry unloaded)."""
+    worker = hass.data.get(DOMAIN, {}).pop(WORKER_KEY, None)
+    if worker is not None:
+        await worker.async_shutdown()
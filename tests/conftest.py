@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+import pytest
+
+
+class EventBus:
+    """Records what is fired on hass.bus."""
+
+    def __init__(self) -> None:
+        self.fired: list[tuple[str, dict[str, Any]]] = []
+
+    def async_fire(self, event_type: str, event_data: Optional[dict[str, Any]] = None) -> None:
+        self.fired.append((event_type, event_data or {}))
+
+    def data(self, event_type: str) -> list[dict[str, Any]]:
+        """Event data of the fired events of one type, in order."""
+        return [d for t, d in self.fired if t == event_type]
+
+
+@pytest.fixture
+def bus() -> EventBus:
+    return EventBus()
+
+
+@pytest.fixture
+def hass(bus: EventBus) -> SimpleNamespace:
+    """Just enough of HomeAssistant for code that only fires events."""
+    return SimpleNamespace(bus=bus)
+
+
+@pytest.fixture
+def make_entry() -> Callable[..., SimpleNamespace]:
+    """Config entry stand-in with the given options."""
+
+    def _make(**options: Any) -> SimpleNamespace:
+        return SimpleNamespace(entry_id="test", data={}, options=dict(options))
+
+    return _make
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import gzip
+import os
+
+import pytest
+
+from custom_components.air_traffic_merge.aircraft_db import (
+    AircraftDb,
+    compile_csv,
+    enrich_aircraft,
+    load_aircraft_db,
+)
+
+CSV = """icao;reg;type;flags;desc;year;ownop
+4b1805;HB-ZRW;EC35;0000;EUROCOPTER EC-135;2010;Rega
+000001;N1;C172;0000;CESSNA 172;;
+3c6444;D-AIBD;A319;0000;AIRBUS A-319;2006;Lufthansa
+ffffff;TEST-LAST;;;;;
+ae1234;12-3456;C17;1000;BOEING C-17;;USAF
+not-hex;x;x;x;x;x;x
+"""
+
+
+@pytest.fixture
+def csv_path(tmp_path) -> str:
+    path = tmp_path / "aircraft.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def db(csv_path, tmp_path):
+    db = load_aircraft_db(csv_path, str(tmp_path / "cache"))
+    yield db
+    db.close()
+
+
+def test_compile_skips_header_and_garbage(csv_path, tmp_path) -> None:
+    assert compile_csv(csv_path, str(tmp_path / "out.bin")) == 5
+
+
+def test_lookup_first_last_and_middle(db: AircraftDb) -> None:
+    assert len(db) == 5
+    # lowest and highest ICAO address: the ends of the binary search
+    assert db.lookup("000001") == {"r": "N1", "t": "C172", "desc": "CESSNA 172"}
+    assert db.lookup("ffffff") == {"r": "TEST-LAST"}
+    assert db.lookup("4b1805") == {"r": "HB-ZRW", "t": "EC35", "desc": "EUROCOPTER EC-135", "ownOp": "Rega"}
+    assert db.lookup(" 3C6444 ")["ownOp"] == "Lufthansa"
+    assert db.lookup("ae1234")["dbFlags"] == 1
+
+
+@pytest.mark.parametrize("hx", ["000000", "4b1806", "~4b1805", "", "zz", None])
+def test_lookup_missing(db: AircraftDb, hx) -> None:
+    assert db.lookup(hx) is None
+
+
+def test_rebuilt_when_csv_changes(csv_path, tmp_path) -> None:
+    cache = str(tmp_path / "cache")
+    first = load_aircraft_db(csv_path, cache)
+    assert first.lookup("400001") is None
+    first.close()
+
+    with open(csv_path, "a", encoding="utf-8") as fh:
+        fh.write("400001;G-TEST;B738;0000;BOEING 737-800;;\n")
+    later = os.path.getmtime(first.path) + 10
+    os.utime(csv_path, (later, later))
+
+    second = load_aircraft_db(csv_path, cache)
+    try:
+        assert second.path == first.path
+        assert len(second) == 6
+        assert second.lookup("400001")["r"] == "G-TEST"
+    finally:
+        second.close()
+
+
+def test_opens_compiled_file_and_gzip(csv_path, tmp_path) -> None:
+    gz = tmp_path / "aircraft.csv.gz"
+    gz.write_bytes(gzip.compress(CSV.encode("utf-8")))
+    compiled = load_aircraft_db(str(gz), str(tmp_path / "cache"))
+    try:
+        direct = load_aircraft_db(compiled.path, str(tmp_path / "unused"))
+        try:
+            assert direct.path == compiled.path
+            assert direct.lookup("3c6444")["r"] == "D-AIBD"
+        finally:
+            direct.close()
+    finally:
+        compiled.close()
+
+
+def test_enrich_leaves_input_untouched(db: AircraftDb) -> None:
+    aircraft = [{"hex": "4B1805", "t": "EC45"}, {"hex": "~000001"}, "junk"]
+
+    out = enrich_aircraft(db, aircraft)
+
+    assert out[0] == {"hex": "4B1805", "t": "EC45", "r": "HB-ZRW", "desc": "EUROCOPTER EC-135", "ownOp": "Rega"}
+    assert aircraft[0] == {"hex": "4B1805", "t": "EC45"}
+    assert out[1:] == aircraft[1:]
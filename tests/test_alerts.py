@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from custom_components.air_traffic_merge.alerts import ALERT_RESET, AlertEngine, parse_hex_ranges, parse_squawks
+from custom_components.air_traffic_merge.const import EVENT_ALERT
+
+_OPTIONS = {"alert_squawks": "", "alert_descent_fpm": 0, "alert_military": False, "alert_hex_ranges": ""}
+
+
+@pytest.fixture
+def make_engine(hass, make_entry):
+    def _make(**options: Any) -> AlertEngine:
+        return AlertEngine(hass, make_entry(**{**_OPTIONS, **options}))
+
+    return _make
+
+
+def test_parse_hex_ranges_sorts_and_merges() -> None:
+    assert parse_hex_ranges("") == []
+    assert parse_hex_ranges(" 3f0000-3fffff, ae1234 ,") == [(0x3F0000, 0x3FFFFF), (0xAE1234, 0xAE1234)]
+    assert parse_hex_ranges("400000-400fff,3f0000-3fffff,3ff000-400010") == [(0x3F0000, 0x400FFF)]
+    # adjacent ranges are merged too
+    assert parse_hex_ranges("100-1ff,200-2ff") == [(0x100, 0x2FF)]
+
+
+@pytest.mark.parametrize("value", ["3fffff-3f0000", "xyz", "12-zz"])
+def test_parse_hex_ranges_rejects(value: str) -> None:
+    with pytest.raises(ValueError):
+        parse_hex_ranges(value)
+
+
+def test_parse_squawks() -> None:
+    assert parse_squawks(" 7700, 7600 ,, 0020") == ["7700", "7600", "0020"]
+    assert parse_squawks("") == []
+
+
+@pytest.mark.parametrize("value", ["7800", "770", "77000", "7a00", "7700;7600"])
+def test_parse_squawks_rejects(value: str) -> None:
+    with pytest.raises(ValueError):
+        parse_squawks(value)
+
+
+def test_hex_range_bisect(make_engine) -> None:
+    engine = make_engine(alert_hex_ranges="3f0000-3fffff,ae0000-afffff,00000a")
+    aircraft = [
+        {"hex": "3f0000"},
+        {"hex": "3FFFFF"},
+        {"hex": "400000"},
+        {"hex": "adffff"},
+        {"hex": "af1234"},
+        {"hex": "00000a"},
+        {"hex": "000009"},
+        {"hex": "~3f0001"},
+    ]
+
+    matches = engine.evaluate(aircraft, 0)
+
+    assert sorted(matches) == ["00000a", "3f0000", "3fffff", "af1234"]
+    assert matches["af1234"] == [("hex_range", "ae0000-afffff")]
+
+
+def test_rules_and_details(make_engine, bus) -> None:
+    engine = make_engine(alert_squawks="7700,7000", alert_descent_fpm=3000, alert_military=True)
+    aircraft = [
+        {"hex": "a1", "squawk": "7700", "flight": "DLH1 "},
+        {"hex": "a2", "squawk": "7000"},
+        {"hex": "a3", "squawk": "1200", "baro_rate": -3500},
+        {"hex": "a4", "baro_rate": -2000, "dbFlags": 2},
+        {"hex": "a5", "dbFlags": 1, "squawk": "7700"},
+    ]
+
+    matches = engine.evaluate(aircraft, 0)
+
+    assert matches["a1"] == [("squawk_7700", "emergency")]
+    assert matches["a2"] == [("squawk_7000", "squawk")]
+    assert matches["a3"] == [("descent", "-3500 ft/min")]
+    assert "a4" not in matches
+    assert sorted(rule for rule, _d in matches["a5"]) == ["military", "squawk_7700"]
+    assert bus.data(EVENT_ALERT)[0]["callsign"] == "DLH1"
+    assert len(bus.data(EVENT_ALERT)) == 5
+
+
+def test_alert_fires_once_until_clear(make_engine, bus) -> None:
+    engine = make_engine(alert_squawks="7700")
+    emergency = [{"hex": "a1", "squawk": "7700"}]
+
+    engine.evaluate(emergency, 0)
+    engine.evaluate(emergency, 10)
+    engine.evaluate([], 20)
+    # back before it was clear for ALERT_RESET seconds
+    engine.evaluate(emergency, 10 + ALERT_RESET)
+    assert len(bus.data(EVENT_ALERT)) == 1
+
+    engine.evaluate([], 10 + ALERT_RESET)
+    engine.evaluate([], 11 + 2 * ALERT_RESET)
+    engine.evaluate(emergency, 12 + 2 * ALERT_RESET)
+    assert len(bus.data(EVENT_ALERT)) == 2
+
+
+def test_invalid_options_disable_the_rule(make_engine, bus) -> None:
+    engine = make_engine(alert_squawks="77", alert_hex_ranges="zz")
+
+    assert engine.evaluate([{"hex": "a1", "squawk": "77"}], 0) == {}
+    assert bus.data(EVENT_ALERT) == []
+
+
+def test_rules_follow_option_changes(make_engine, bus) -> None:
+    engine = make_engine()
+    assert engine.evaluate([{"hex": "a1", "squawk": "7700"}], 0) == {}
+
+    engine.entry.options["alert_squawks"] = "7700"
+    assert engine.evaluate([{"hex": "a1", "squawk": "7700"}], 1) == {"a1": [("squawk_7700", "emergency")]}
+    assert len(bus.data(EVENT_ALERT)) == 1
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+
+from custom_components.air_traffic_merge.pipeline import _apply_budget, _fit_budget, _json_size
+
+
+def _recorded_size(v) -> int:
+    return len(json.dumps(v, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _flight(i: int, **extra) -> dict:
+    return {"hex": f"{i:06x}", "callsign": f"TST{i}", "source": "ADSB", "dist_km": float(i), **extra}
+
+
+def test_json_size_counts_utf8_and_escapes() -> None:
+    for v in ({"airline": "Société Générale ✈"}, ['quote " and \\ backslash', None, True, 1.5], {"nested": {"a": [1, 2]}}):
+        assert _json_size(v) == _recorded_size(v)
+    assert _json_size("é") == 4
+
+
+def test_fit_budget_keeps_leading_items() -> None:
+    items = [{"n": i} for i in range(5)]
+    size = _json_size(items[0]) + 1
+
+    kept, left = _fit_budget(items, 3 * size + 2)
+
+    assert kept == items[:3]
+    assert left == 2
+
+
+def test_fit_budget_stops_at_first_item_too_big() -> None:
+    items = [{"n": 1}, {"n": "x" * 100}, {"n": 2}]
+
+    kept, _left = _fit_budget(items, 50)
+
+    assert kept == [{"n": 1}]
+
+
+def test_apply_budget_priorities_and_size() -> None:
+    flights = [_flight(i) for i in range(1, 200)]
+    flights.append(_flight(500, tracked=True))
+    aircraft = [{"hex": f["hex"], "flight": f["callsign"], "alt_baro": 10000} for f in flights]
+    attrs = {"last_update": 0, "flights": flights, "aircraft": aircraft, "tracking_enabled": True}
+    budget = 4096
+
+    _apply_budget(attrs, budget)
+
+    assert _recorded_size(attrs) <= budget
+    kept = attrs["flights"]
+    # tracked first, then the nearest
+    assert kept[0]["hex"] == _flight(500)["hex"]
+    assert [f["dist_km"] for f in kept[1:]] == sorted(f["dist_km"] for f in kept[1:])
+    assert kept[1]["dist_km"] == 1.0
+    assert 0 < attrs["truncated_count"] == len(flights) - len(kept)
+    # raw aircraft only for kept flights, in the same order
+    kept_hex = [f["hex"] for f in kept]
+    assert [ac["hex"] for ac in attrs["aircraft"]] == kept_hex[: len(attrs["aircraft"])]
+    assert attrs["aircraft_truncated_count"] == len(aircraft) - len(attrs["aircraft"])
+
+
+def test_apply_budget_leaves_room_for_large_counts() -> None:
+    # thousands of dropped flights: the counts alone take 8 more bytes than zeros
+    flights = [_flight(i) for i in range(1, 5000)]
+    aircraft = [{"hex": f["hex"]} for f in flights] + [{"hex": f"x{i}"} for i in range(10000)]
+    empty = {"flights": [], "aircraft": [], "truncated_count": 0, "aircraft_truncated_count": 0}
+
+    for budget in range(_json_size(empty) + 40, _json_size(empty) + 400, 7):
+        attrs = {"flights": flights, "aircraft": aircraft}
+        _apply_budget(attrs, budget)
+
+        assert attrs["truncated_count"] > 999
+        assert _json_size(attrs) <= budget
+
+
+def test_apply_budget_keeps_everything_that_fits() -> None:
+    flights = [_flight(i) for i in range(3)]
+    aircraft = [{"hex": f["hex"]} for f in flights]
+    attrs = {"flights": flights, "aircraft": aircraft}
+
+    _apply_budget(attrs, 16 * 1024)
+
+    assert len(attrs["flights"]) == 3
+    assert len(attrs["aircraft"]) == 3
+    assert attrs["truncated_count"] == 0
+    assert attrs["aircraft_truncated_count"] == 0
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pytest
+
+from custom_components.air_traffic_merge.coverage import ALT_BANDS_FT, MAX_POS_AGE, SECTORS, CoverageMap
+
+HOME_LAT, HOME_LON = 47.0, 8.0
+KM_PER_DEG_LAT = 111.195
+
+
+def _north(km: float, **extra) -> dict:
+    return {"hex": "a1", "lat": HOME_LAT + km / KM_PER_DEG_LAT, "lon": HOME_LON, **extra}
+
+
+def _cell(cmap: CoverageMap, sector: int, band: int) -> int:
+    return sector * len(cmap.bands) + band
+
+
+@pytest.mark.parametrize(
+    ("alt", "band"),
+    [("ground", 0), (0, 0), (4999, 0), (5000, 1), (19999, 2), (20000, 3), (45000, len(ALT_BANDS_FT) - 1), (-300, 0)],
+)
+def test_altitude_band(alt, band: int) -> None:
+    assert CoverageMap()._band(alt) == band
+
+
+@pytest.mark.parametrize("alt", [None, "", "n/a"])
+def test_altitude_band_unknown(alt) -> None:
+    assert CoverageMap()._band(alt) == -1
+
+
+def test_sector_indexing() -> None:
+    cmap = CoverageMap()
+    sector_deg = 360 / SECTORS
+    aircraft = [
+        _north(50, alt_baro=12000),
+        # due east, ~40 km
+        {"lat": HOME_LAT, "lon": HOME_LON + 0.5, "alt_baro": 2000},
+        # just west of north
+        {"lat": HOME_LAT + 0.5, "lon": HOME_LON - 0.01, "alt_baro": 31000},
+    ]
+
+    assert cmap.update(aircraft, HOME_LAT, HOME_LON, 0) == 3
+
+    assert cmap.max_km[_cell(cmap, 0, 2)] == pytest.approx(50, abs=0.1)
+    assert cmap.counts[_cell(cmap, int(90 // sector_deg), 0)] == 1
+    assert cmap.counts[_cell(cmap, SECTORS - 1, 4)] == 1
+    assert sum(cmap.counts) == 3
+
+
+def test_keeps_max_range_and_counts() -> None:
+    cmap = CoverageMap()
+    cmap.update([_north(80, alt_baro=35000)], HOME_LAT, HOME_LON, 0)
+    cmap.update([_north(30, alt_baro=35000)], HOME_LAT, HOME_LON, 1)
+
+    cell = _cell(cmap, 0, 4)
+    assert cmap.max_km[cell] == pytest.approx(80, abs=0.1)
+    assert cmap.counts[cell] == 2
+    assert cmap.since == 0
+
+
+def test_skips_unusable_positions() -> None:
+    cmap = CoverageMap()
+    aircraft = [
+        _north(50, alt_baro=10000, seen_pos=MAX_POS_AGE + 1),
+        _north(900, alt_baro=10000),
+        _north(50),
+        # readsb receiver-relative values only (nautical miles), no position
+        {"hex": "a2", "r_dst": 20.0, "r_dir": 90.0, "alt_baro": 10000},
+        "not an aircraft",
+    ]
+
+    assert cmap.update(aircraft, HOME_LAT, HOME_LON, 0) == 0
+    assert sum(cmap.counts) == 0
+
+
+def test_roundtrip_and_summary() -> None:
+    cmap = CoverageMap()
+    cmap.update([_north(50, alt_baro=12000), _north(20, alt_baro="ground")], HOME_LAT, HOME_LON, 100)
+
+    restored = CoverageMap()
+    assert restored.load(cmap.as_dict()) is True
+    assert list(restored.counts) == list(cmap.counts)
+    assert restored.since == 100
+
+    summary = restored.summary()
+    assert summary["10000ft"] == {"max_range_km": pytest.approx(50, abs=0.1), "positions": 1}
+    assert summary["0ft"]["positions"] == 1
+    assert summary["30000ft"] == {"max_range_km": 0.0, "positions": 0}
+
+
+def test_load_rejects_other_layout() -> None:
+    other = CoverageMap(sectors=36)
+    assert CoverageMap().load(other.as_dict()) is False
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from custom_components.air_traffic_merge.const import EVENT_TRACKED, EVENT_TRACKED_BATCH
+from custom_components.air_traffic_merge.events import MAX_EVENTS_PER_POLL, TrackedEvents
+
+_OPTIONS = {"event_miss_polls": 3, "event_miss_seconds": 60, "event_cooldown": 120, "event_batch": False}
+
+
+@pytest.fixture
+def make_events(hass, make_entry):
+    def _make(**options: Any) -> TrackedEvents:
+        return TrackedEvents(hass, make_entry(**{**_OPTIONS, **options}))
+
+    return _make
+
+
+def _actions(bus) -> list[tuple[str, str]]:
+    return [(d["action"], d["target"]) for d in bus.data(EVENT_TRACKED)]
+
+
+def _state(hx: str = "4b1805") -> dict[str, Any]:
+    return {"present": True, "hex": hx, "callsign": "CHX16", "registration": "HB-ZRW", "dist_km": 4.2, "alt_m": 900}
+
+
+def test_appears_at_once_with_target_fields(make_events, bus) -> None:
+    events = make_events()
+    events.update({"CHX16": _state()}, 0)
+
+    assert _actions(bus) == [("appeared", "CHX16")]
+    data = bus.fired[0][1]
+    assert data["hex"] == "4b1805"
+    assert data["dist_km"] == 4.2
+    assert data["last_update"] == 0
+
+
+def test_disappears_after_missed_polls_and_seconds(make_events, bus) -> None:
+    events = make_events(event_cooldown=0)
+    events.update({"CHX16": _state()}, 0)
+
+    # three missed polls, but only 30 s without the target
+    for now in (10, 20, 30):
+        events.update({}, now)
+    assert _actions(bus) == [("appeared", "CHX16")]
+
+    events.update({}, 61)
+    assert _actions(bus) == [("appeared", "CHX16"), ("disappeared", "CHX16")]
+
+
+def test_single_missed_poll_is_not_enough(make_events, bus) -> None:
+    # 60 s, but a single missed poll (sparse polling)
+    events = make_events(event_cooldown=0)
+    events.update({"CHX16": _state()}, 0)
+    events.update({}, 65)
+
+    assert _actions(bus) == [("appeared", "CHX16")]
+
+
+def test_disappear_waits_for_cooldown(make_events, bus) -> None:
+    events = make_events()
+    events.update({"CHX16": _state()}, 0)
+    for now in range(10, 120, 10):
+        events.update({}, now)
+    assert _actions(bus) == [("appeared", "CHX16")]
+
+    events.update({}, 120)
+    assert _actions(bus) == [("appeared", "CHX16"), ("disappeared", "CHX16")]
+
+
+def test_flap_within_cooldown_is_silent(make_events, bus) -> None:
+    events = make_events(event_miss_seconds=20)
+    events.update({"CHX16": _state()}, 0)
+    for now in (10, 20, 30, 40):
+        events.update({}, now)
+    events.update({"CHX16": _state()}, 50)
+    events.update({"CHX16": _state()}, 200)
+
+    assert _actions(bus) == [("appeared", "CHX16")]
+
+
+def test_gone_target_can_appear_again(make_events, bus) -> None:
+    events = make_events(event_cooldown=0)
+    events.update({"CHX16": _state()}, 0)
+    for now in (30, 60, 90):
+        events.update({}, now)
+    events.update({"CHX16": _state()}, 100)
+
+    assert _actions(bus) == [("appeared", "CHX16"), ("disappeared", "CHX16"), ("appeared", "CHX16")]
+
+
+def test_seeded_targets_do_not_appear_again(make_events, bus) -> None:
+    events = make_events()
+    events.seed({"CHX16": _state(), "DLH1": {"present": False}}, 0)
+    events.update({"CHX16": _state()}, 10)
+
+    assert bus.fired == []
+
+
+def test_single_events_are_capped_per_poll(make_events, bus) -> None:
+    events = make_events()
+    present = {f"T{i:02d}": _state(f"{i:06x}") for i in range(MAX_EVENTS_PER_POLL + 5)}
+
+    events.update(present, 0)
+    assert len(bus.fired) == MAX_EVENTS_PER_POLL
+
+    events.update(present, 10)
+    assert len(bus.fired) == MAX_EVENTS_PER_POLL + 5
+    assert sorted(t for _a, t in _actions(bus)) == sorted(present)
+
+
+def test_batch_event(make_events, bus) -> None:
+    events = make_events(event_batch=True, event_cooldown=0)
+    events.update({"CHX16": _state(), "DLH1": _state("3c6444")}, 0)
+    for now in (30, 60, 90):
+        events.update({"CHX16": _state()}, now)
+
+    assert [t for t, _d in bus.fired] == [EVENT_TRACKED_BATCH, EVENT_TRACKED_BATCH]
+    first, second = bus.fired[0][1], bus.fired[1][1]
+    assert sorted(d["target"] for d in first["appeared"]) == ["CHX16", "DLH1"]
+    assert first["disappeared"] == []
+    assert second["appeared"] == []
+    assert [d["target"] for d in second["disappeared"]] == ["DLH1"]
+    assert events.fired == 2
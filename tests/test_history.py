@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import pytest
+
+from custom_components.air_traffic_merge.history import PositionRing, closest_approach, encode_polyline
+
+HOME = (47.0, 8.0)
+# 10 km south of home
+SOUTH_LAT = 47.0 - 10 / 111.195
+
+
+def _eastbound(start_lon: float, samples: int, step_s: float = 5.0, deg_per_s: float = 0.002) -> PositionRing:
+    ring = PositionRing()
+    for i in range(samples):
+        ring.append(1000.0 + i * step_s, SOUTH_LAT, start_lon + i * step_s * deg_per_s, 10000.0)
+    return ring
+
+
+def test_cpa_of_passing_aircraft() -> None:
+    ring = _eastbound(7.8, 7)
+    last_ts, _lat, last_lon, _alt = ring.last()
+
+    cpa = closest_approach(ring, *HOME, now=last_ts)
+
+    assert cpa["approaching"] is True
+    assert cpa["cpa_km"] == pytest.approx(10.0, abs=0.2)
+    assert cpa["cpa_in_s"] == pytest.approx((HOME[1] - last_lon) / 0.002, abs=2)
+    assert cpa["cpa_eta"] == pytest.approx(last_ts + cpa["cpa_in_s"], abs=1)
+
+
+def test_cpa_extrapolates_to_now() -> None:
+    ring = _eastbound(7.8, 7)
+    last_ts = ring.last()[0]
+
+    later = closest_approach(ring, *HOME, now=last_ts + 20)
+    now = closest_approach(ring, *HOME, now=last_ts)
+
+    assert later["cpa_in_s"] == pytest.approx(now["cpa_in_s"] - 20, abs=1)
+    assert later["dist_km"] < now["dist_km"]
+
+
+def test_cpa_receding_aircraft() -> None:
+    ring = _eastbound(8.2, 7)
+
+    cpa = closest_approach(ring, *HOME, now=ring.last()[0])
+
+    assert cpa["approaching"] is False
+    assert cpa["cpa_in_s"] == 0
+    assert cpa["cpa_km"] == cpa["dist_km"]
+
+
+def test_cpa_falls_back_to_ground_speed_and_track() -> None:
+    ring = PositionRing()
+    ring.append(1000.0, SOUTH_LAT, 7.9, None)
+    ring.gs_kmh = 540.0
+    ring.track_deg = 90.0
+
+    cpa = closest_approach(ring, *HOME, now=1000.0)
+
+    assert cpa["cpa_km"] == pytest.approx(10.0, abs=0.2)
+    # 0.1 deg of longitude at 47N is about 7.6 km, at 0.15 km/s
+    assert cpa["cpa_in_s"] == pytest.approx(7.58 / 0.15, abs=2)
+
+
+def test_cpa_without_velocity() -> None:
+    ring = PositionRing()
+    assert closest_approach(ring, *HOME, now=0.0) is None
+
+    ring.append(1000.0, SOUTH_LAT, 7.9, None)
+    assert closest_approach(ring, *HOME, now=1000.0) is None
+
+
+def test_append_ignores_repeated_reports() -> None:
+    ring = PositionRing()
+    assert ring.append(1000.0, 47.0, 8.0, None) is True
+    assert ring.append(1000.0, 47.1, 8.1, None) is False
+    assert ring.append(999.0, 47.1, 8.1, None) is False
+    assert len(ring) == 1
+
+
+def test_append_replaces_sample_when_barely_moving() -> None:
+    ring = PositionRing()
+    ring.append(1000.0, 47.0, 8.0, None)
+    # about 10 m
+    ring.append(1005.0, 47.0001, 8.0, None)
+
+    assert len(ring) == 1
+    assert ring.last()[0] == 1005.0
+
+
+def test_straight_flight_keeps_only_the_ends() -> None:
+    ring = PositionRing()
+    for i in range(6):
+        ring.append(1000.0 + i * 5, 47.0, 8.0 + i * 0.01, None)
+
+    assert [s[2] for s in ring.samples()] == pytest.approx([8.0, 8.05])
+
+
+def test_turns_and_long_gaps_are_kept() -> None:
+    ring = PositionRing()
+    ring.append(1000.0, 47.0, 8.0, None)
+    ring.append(1005.0, 47.0, 8.01, None)
+    # 90 degree turn north
+    ring.append(1010.0, 47.01, 8.01, None)
+    assert len(ring) == 3
+
+    # straight on, but replacing the corner's successor would leave a gap above 5 km
+    ring.append(1040.0, 47.07, 8.01, None)
+    assert len(ring) == 4
+
+
+def test_ring_drops_oldest_when_full() -> None:
+    ring = PositionRing(size=3)
+    # zig-zag, every sample is a turn
+    for i in range(5):
+        ring.append(1000.0 + i, 47.0 + (i % 2) * 0.01, 8.0 + i * 0.01, None)
+
+    assert len(ring) == 3
+    assert [s[0] for s in ring.samples()] == [1002.0, 1003.0, 1004.0]
+    assert [s[0] for s in ring.samples_reversed()] == [1004.0, 1003.0, 1002.0]
+    assert ring.first()[0] == 1002.0
+
+
+def test_trail_polyline() -> None:
+    # reference example of the encoded polyline format
+    assert encode_polyline([(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+    ring = PositionRing()
+    ring.append(1000.0, 38.5, -120.2, None)
+    ring.append(1010.0, 40.7, -120.95, None)
+    assert ring.trail() == "_p~iF~ps|U_ulLnnqC"
+    assert ring.trail(since=1005.0) == encode_polyline([(40.7, -120.95)])
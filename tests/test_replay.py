@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import os
+
+from custom_components.air_traffic_merge.replay import (
+    BACKUP_COUNT,
+    KIND_ADSB,
+    KIND_FR24,
+    SnapshotPlayer,
+    SnapshotRecorder,
+    decode,
+    iter_records,
+    log_files,
+)
+
+
+def _payload(i: int) -> bytes:
+    return json.dumps({"now": 1000 + i, "aircraft": [{"hex": f"{i:06x}"}]}).encode()
+
+
+def _record(path: str, count: int, start: float = 100.0, **kwargs) -> SnapshotRecorder:
+    rec = SnapshotRecorder(path, **kwargs)
+    for i in range(count):
+        rec.append(start + i, KIND_ADSB, _payload(i))
+    return rec
+
+
+def test_round_trip(tmp_path) -> None:
+    path = str(tmp_path / "snapshots.rec")
+    rec = SnapshotRecorder(path)
+    rec.append(100.0, KIND_ADSB, _payload(0))
+    rec.append(101.5, KIND_FR24, b'{"flights": []}')
+
+    records = list(iter_records(path))
+
+    assert [(ts, kind) for ts, kind, _body in records] == [(100.0, KIND_ADSB), (101.5, KIND_FR24)]
+    assert decode(records[0][2]) == json.loads(_payload(0))
+    assert decode(records[1][2]) == {"flights": []}
+
+
+def test_rotation_keeps_backups_oldest_first(tmp_path) -> None:
+    path = str(tmp_path / "snapshots.rec")
+    # every append after the first rotates
+    _record(path, 5, max_bytes=1)
+
+    assert log_files(path) == [f"{path}.{i}" for i in range(BACKUP_COUNT, 0, -1)] + [path]
+    assert not os.path.exists(f"{path}.{BACKUP_COUNT + 1}")
+    # the oldest records went with the dropped file
+    assert [ts for ts, _kind, _body in iter_records(path)] == [102.0, 103.0, 104.0]
+
+
+def test_truncated_tail_is_ignored(tmp_path) -> None:
+    path = str(tmp_path / "snapshots.rec")
+    _record(path, 3)
+    with open(path, "r+b") as fh:
+        fh.truncate(os.path.getsize(path) - 3)
+
+    assert [ts for ts, _kind, _body in iter_records(path)] == [100.0, 101.0]
+
+
+def test_foreign_file_yields_nothing(tmp_path) -> None:
+    path = tmp_path / "snapshots.rec"
+    path.write_bytes(b"not a snapshot log")
+
+    assert list(iter_records(str(path))) == []
+
+
+def test_player_returns_every_due_record_and_loops(tmp_path) -> None:
+    path = str(tmp_path / "snapshots.rec")
+    _record(path, 10)
+    SnapshotRecorder(path).append(103.5, KIND_FR24, b"{}")
+    player = SnapshotPlayer(path, speed=10)
+
+    first = player.due_payloads(5000.0)
+    assert [p["aircraft"][0]["hex"] for p in first] == ["000000"]
+
+    # 0.5 s at 10x: records 1-5 are due, none skipped, FR24 ignored
+    batch = player.due_payloads(5000.5)
+    assert [p["aircraft"][0]["hex"] for p in batch] == [f"{i:06x}" for i in range(1, 6)]
+    # `now` is the wall time each record fell due
+    assert [p["now"] for p in batch] == [5000.0 + i / 10 for i in range(1, 6)]
+
+    rest = player.due_payloads(5001.0)
+    assert len(rest) == 4
+    assert player.loops == 1
+
+    # next call starts over
+    assert [p["aircraft"][0]["hex"] for p in player.due_payloads(5002.0)] == ["000000"]
+
+
+def test_player_without_records(tmp_path) -> None:
+    player = SnapshotPlayer(str(tmp_path / "missing.rec"))
+
+    assert player.due_payloads(0.0) == []
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.air_traffic_merge import state_cache
+from custom_components.air_traffic_merge.state_cache import MAX_FLIGHTS_AGE, StateCache, pack_rows, unpack_rows
+
+
+class _Store:
+    """In-memory stand-in for helpers.storage.Store."""
+
+    saved = None
+
+    def __init__(self, hass, version, key, private=False) -> None:
+        self.delayed = None
+
+    async def async_load(self):
+        return type(self).saved
+
+    def async_delay_save(self, func, delay) -> None:
+        self.delayed = func
+
+    async def async_save(self, data) -> None:
+        type(self).saved = data
+
+
+@pytest.fixture
+def cache(monkeypatch) -> StateCache:
+    monkeypatch.setattr(state_cache, "Store", _Store)
+    monkeypatch.setattr(_Store, "saved", None)
+    return StateCache(None, "entry")
+
+
+def test_pack_rows_round_trip() -> None:
+    rows = [
+        {"hex": "abc123", "callsign": "DLH1", "alt_m": 10000, "trail": "_p~iF~ps|U"},
+        {"hex": "def456", "registration": "D-ABCD", "alt_m": None},
+        {},
+    ]
+
+    packed = pack_rows(rows)
+
+    # field names once, trail is not persisted
+    assert packed["fields"] == ["hex", "callsign", "alt_m", "registration"]
+    assert packed["rows"][0] == ["abc123", "DLH1", 10000, None]
+    # missing and None values both come back as missing
+    assert unpack_rows(packed) == [
+        {"hex": "abc123", "callsign": "DLH1", "alt_m": 10000},
+        {"hex": "def456", "registration": "D-ABCD"},
+        {},
+    ]
+
+
+def test_unpack_rows_empty() -> None:
+    assert unpack_rows({}) == []
+    assert unpack_rows(pack_rows([])) == []
+
+
+def test_save_and_restore(cache: StateCache) -> None:
+    now = int(time.time())
+    store = {
+        "flights": [{"hex": "abc123", "callsign": "DLH1", "trail": "x"}],
+        "targets": {
+            "DLH1": {"present": True, "hex": "abc123", "dist_km": 12.0},
+            "D-ABCD": {"present": False, "hex": "def456"},
+        },
+        "last_update": now,
+        "generation": 42,
+    }
+
+    cache.async_schedule_save(store)
+    asyncio.run(cache.async_flush())
+    restored = asyncio.run(cache.async_load())
+
+    assert restored["restored"] is True
+    assert restored["aircraft"] == []
+    assert "tracking" not in restored
+    assert restored["flights"] == [{"hex": "abc123", "callsign": "DLH1"}]
+    # only present targets, reduced to hex
+    assert restored["targets"] == {"DLH1": {"present": True, "hex": "abc123", "last_seen": now}}
+    assert restored["last_update"] == now
+    assert restored["generation"] == 42
+
+
+def test_restore_drops_old_flights_keeps_targets(cache: StateCache) -> None:
+    old = int(time.time()) - MAX_FLIGHTS_AGE - 10
+    _Store.saved = {
+        "flights": pack_rows([{"hex": "abc123"}]),
+        # dict targets were written by older versions
+        "targets": {"DLH1": {"present": True, "hex": "abc123"}, "DLH2": {"present": False}, "D-ABCD": "def456"},
+        "last_update": old,
+        "generation": 7,
+    }
+
+    restored = asyncio.run(cache.async_load())
+
+    assert restored["flights"] == []
+    assert set(restored["targets"]) == {"DLH1", "D-ABCD"}
+    assert restored["targets"]["D-ABCD"]["hex"] == "def456"
+
+
+def test_restore_without_saved_data(cache: StateCache) -> None:
+    assert asyncio.run(cache.async_load()) is None
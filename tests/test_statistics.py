@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.air_traffic_merge.statistics import TrafficStatistics
+
+# +05:30: local hours do not start on UTC hour boundaries
+TZ = timezone(timedelta(hours=5, minutes=30))
+
+
+def _ts(*args: int) -> float:
+    return datetime(*args, tzinfo=TZ).timestamp()
+
+
+def _flight(hx: str, dist: float = 10.0) -> dict:
+    return {"hex": hx, "dist_km": dist, "aircraft_model": "A320", "airline": "Lufthansa", "source": "ADSB"}
+
+
+def _write(stats: TrafficStatistics, now: float) -> None:
+    stats.write(stats.take_batch(now))
+
+
+def test_busiest_hour_in_local_time(tmp_path) -> None:
+    stats = TrafficStatistics(str(tmp_path / "stats.db"), TZ)
+    stats.add([_flight("a1")], _ts(2026, 3, 2, 9, 10))
+    stats.add([_flight("a1"), _flight("a2"), _flight("a3", 80.0)], _ts(2026, 3, 2, 10, 5))
+    stats.add([_flight("a3")], _ts(2026, 3, 2, 10, 55))
+    stats.add([_flight("a4")], _ts(2026, 3, 2, 11, 0))
+    _write(stats, _ts(2026, 3, 2, 11, 1))
+
+    summary = stats.summary(datetime(2026, 3, 2, tzinfo=TZ))
+
+    assert summary["busiest_hour"] == "2026-03-02T10:00:00+05:30"
+    assert summary["busiest_hour_aircraft"] == 3
+    assert summary["unique_aircraft"] == 4
+    assert summary["max_range_km"] == 80.0
+    assert summary["by_airline"] == {"Lufthansa": 5}
+
+
+def test_month_total_survives_pruning(tmp_path) -> None:
+    stats = TrafficStatistics(str(tmp_path / "stats.db"), TZ)
+    stats.add([_flight("a1"), _flight("a2")], _ts(2026, 1, 30, 12, 0))
+    stats.add([_flight("a2"), _flight("a3")], _ts(2026, 1, 31, 12, 0))
+    _write(stats, _ts(2026, 1, 31, 12, 1))
+    assert stats.summary(datetime(2026, 1, 1, tzinfo=TZ))["unique_aircraft"] == 3
+
+    # first poll of a new month prunes the finished month's seen rows
+    stats.add([_flight("a9")], _ts(2026, 2, 1, 0, 5))
+    _write(stats, _ts(2026, 2, 1, 0, 6))
+
+    assert stats.summary(datetime(2026, 1, 1, tzinfo=TZ))["unique_aircraft"] == 1
+    assert stats.month_totals() == {"2026-01": 3}
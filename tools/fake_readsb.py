@@ -0,0 +1,221 @@
+"""Fake readsb/tar1090 server with synthetic traffic for load and soak tests.
+
+    python tools/fake_readsb.py --aircraft 1000 --tracked CHX16,D-HXYZ
+
+Serves /data/aircraft.json and /aircraft.json on 127.0.0.1 only. Aircraft fly
+straight with gentle turns and climbs, leave the area and are replaced by new
+ones, drop out of single responses and occasionally only send positions late.
+Responses can be made slow or failing to test timeouts and error handling.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import string
+import time
+from typing import Any, Optional
+
+from aiohttp import web
+
+_EARTH_RADIUS_KM = 6371.0
+_KM_PER_NMI = 1.852
+
+STATS_KEY = web.AppKey("stats", dict)
+
+_AIRLINES = ("DLH", "EWG", "RYR", "EZY", "BAW", "AFR", "KLM", "UAE", "THY", "SWR", "AUA", "CFG")
+_TYPES = ("A320", "A20N", "A321", "B738", "B38M", "A333", "B77W", "E190", "CRJ9", "DH8D", "C172", "EC35")
+
+
+def _random_hex(rng: random.Random) -> str:
+    return f"{rng.randrange(0x300000, 0x4FFFFF):06x}"
+
+
+def _random_reg(rng: random.Random) -> str:
+    return "D-" + "".join(rng.choice(string.ascii_uppercase) for _ in range(4))
+
+
+class Traffic:
+    """N synthetic aircraft around home, moved on every snapshot."""
+
+    def __init__(
+        self,
+        count: int,
+        home_lat: float,
+        home_lon: float,
+        radius_km: float = 250.0,
+        tracked: tuple[str, ...] = (),
+        dropout: float = 0.02,
+        late_pos: float = 0.05,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.home_lat = home_lat
+        self.home_lon = home_lon
+        self.radius_km = radius_km
+        self.tracked = tracked
+        self.dropout = dropout
+        self.late_pos = late_pos
+        self._rng = random.Random(seed)
+        self._last = time.time()
+        self.messages = 0
+        self.aircraft: list[dict[str, Any]] = [self._spawn(i, anywhere=True) for i in range(count)]
+
+    def _spawn(self, index: int, anywhere: bool = False) -> dict[str, Any]:
+        rng = self._rng
+        # new aircraft start at the edge, flying roughly towards home
+        dist = self.radius_km * (math.sqrt(rng.random()) if anywhere else 0.98)
+        bearing = rng.uniform(0, 360)
+        lat, lon = self._offset(self.home_lat, self.home_lon, bearing, dist)
+        track = (bearing + 180 + rng.uniform(-60, 60)) % 360
+        ac = {
+            "hex": _random_hex(rng),
+            "flight": f"{rng.choice(_AIRLINES)}{rng.randrange(1, 9999)}",
+            "r": _random_reg(rng),
+            "t": rng.choice(_TYPES),
+            "lat": lat,
+            "lon": lon,
+            "track": track,
+            "gs": rng.uniform(120, 480),
+            "alt_baro": rng.randrange(1000, 41000, 100),
+            "baro_rate": 0,
+            # no 75xx-77xx: emergency codes only on purpose
+            "squawk": f"{rng.randrange(0o1000, 0o7400):04o}",
+            "seen_pos": 0.0,
+            "seen": 0.0,
+        }
+        # the first aircraft carry the tracked callsigns/registrations, they come back after leaving
+        if index < len(self.tracked):
+            target = self.tracked[index]
+            if "-" in target:
+                ac["r"] = target
+            else:
+                ac["flight"] = target
+        ac["_index"] = index
+        return ac
+
+    @staticmethod
+    def _offset(lat: float, lon: float, bearing: float, dist_km: float) -> tuple[float, float]:
+        b = math.radians(bearing)
+        dlat = dist_km * math.cos(b) / _EARTH_RADIUS_KM
+        dlon = dist_km * math.sin(b) / (_EARTH_RADIUS_KM * math.cos(math.radians(lat)))
+        return lat + math.degrees(dlat), lon + math.degrees(dlon)
+
+    def _polar(self, lat: float, lon: float) -> tuple[float, float]:
+        x = math.radians(lon - self.home_lon) * math.cos(math.radians((lat + self.home_lat) / 2)) * _EARTH_RADIUS_KM
+        y = math.radians(lat - self.home_lat) * _EARTH_RADIUS_KM
+        return math.hypot(x, y), math.degrees(math.atan2(x, y)) % 360
+
+    def step(self, now: float) -> None:
+        dt = max(0.0, now - self._last)
+        self._last = now
+        rng = self._rng
+        for i, ac in enumerate(self.aircraft):
+            if rng.random() < self.late_pos:
+                # no position this time, readsb reports an aging seen_pos
+                ac["seen_pos"] += dt
+                ac["seen"] = rng.uniform(0, 1)
+                continue
+            ac["track"] = (ac["track"] + rng.uniform(-1.5, 1.5) * dt) % 360
+            if rng.random() < 0.01:
+                ac["baro_rate"] = rng.choice((0, 0, 1500, -1500, -2500))
+            ac["alt_baro"] = int(min(45000, max(0, ac["alt_baro"] + ac["baro_rate"] * dt / 60)))
+            dist = ac["gs"] * _KM_PER_NMI * dt / 3600
+            ac["lat"], ac["lon"] = self._offset(ac["lat"], ac["lon"], ac["track"], dist)
+            ac["seen_pos"] = ac["seen"] = rng.uniform(0, 0.5)
+            if self._polar(ac["lat"], ac["lon"])[0] > self.radius_km:
+                self.aircraft[i] = self._spawn(ac["_index"])
+        self.messages += int(len(self.aircraft) * dt * 4)
+
+    def snapshot(self, now: float) -> dict[str, Any]:
+        self.step(now)
+        out = []
+        for ac in self.aircraft:
+            if self._rng.random() < self.dropout:
+                continue
+            dst, brg = self._polar(ac["lat"], ac["lon"])
+            item = {k: v for k, v in ac.items() if not k.startswith("_")}
+            item["lat"] = round(ac["lat"], 6)
+            item["lon"] = round(ac["lon"], 6)
+            item["gs"] = round(ac["gs"], 1)
+            item["track"] = round(ac["track"], 1)
+            item["seen_pos"] = round(ac["seen_pos"], 1)
+            item["seen"] = round(ac["seen"], 1)
+            # as readsb: distance in nmi, direction in degrees from the receiver
+            item["r_dst"] = round(dst / _KM_PER_NMI, 3)
+            item["r_dir"] = round(brg, 1)
+            item["messages"] = self.messages // max(1, len(self.aircraft))
+            out.append(item)
+        return {"now": round(now, 1), "messages": self.messages, "aircraft": out}
+
+
+def make_app(traffic: Traffic, slow: float = 0.0, slow_delay: float = 5.0, fail: float = 0.0) -> web.Application:
+    rng = random.Random()
+    stats = {"requests": 0, "slow": 0, "failed": 0}
+
+    async def aircraft_json(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+        if rng.random() < fail:
+            stats["failed"] += 1
+            return web.Response(status=500, text="synthetic failure")
+        if rng.random() < slow:
+            stats["slow"] += 1
+            await asyncio.sleep(slow_delay)
+        body = json.dumps(traffic.snapshot(time.time()), separators=(",", ":"))
+        return web.Response(text=body, content_type="application/json")
+
+    app = web.Application()
+    app[STATS_KEY] = stats
+    app.router.add_get("/data/aircraft.json", aircraft_json)
+    app.router.add_get("/aircraft.json", aircraft_json)
+    return app
+
+
+async def start_server(app: web.Application, port: int = 0) -> tuple[web.AppRunner, str]:
+    """Start on 127.0.0.1 (port 0 = any free port), returns the runner and the aircraft.json URL."""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}/data/aircraft.json"
+
+
+def add_traffic_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--aircraft", type=int, default=300, help="number of aircraft (default 300)")
+    parser.add_argument("--lat", type=float, default=50.03, help="home latitude")
+    parser.add_argument("--lon", type=float, default=8.57, help="home longitude")
+    parser.add_argument("--radius", type=float, default=250.0, help="traffic radius in km")
+    parser.add_argument("--tracked", default="", help="comma separated callsigns/registrations to include")
+    parser.add_argument("--dropout", type=float, default=0.02, help="probability an aircraft is missing from a response")
+    parser.add_argument("--late-pos", type=float, default=0.05, help="probability of an aging position per aircraft and poll")
+    parser.add_argument("--slow", type=float, default=0.0, help="probability of a slow response")
+    parser.add_argument("--slow-delay", type=float, default=5.0, help="delay of slow responses in seconds")
+    parser.add_argument("--fail", type=float, default=0.0, help="probability of an HTTP 500 response")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def traffic_from_args(args: argparse.Namespace) -> Traffic:
+    tracked = tuple(t.strip().upper() for t in args.tracked.split(",") if t.strip())
+    return Traffic(args.aircraft, args.lat, args.lon, args.radius, tracked, args.dropout, args.late_pos, args.seed)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    app = make_app(traffic_from_args(args), args.slow, args.slow_delay, args.fail)
+    runner, url = await start_server(app, args.port)
+    print(f"serving {args.aircraft} aircraft at {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8754)
+    add_traffic_args(parser)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,234 @@
+"""Load/soak test of the fetch and merge pipeline against the fake readsb server.
+
+    python tools/soak.py --aircraft 1000 --interval 1 --duration 7200 --tracked CHX16,D-HXYZ
+
+Fetches through the integration's shared ADS-B source and runs every payload
+through the merged sensor's pipeline (pipeline.MergePipeline: aircraft db,
+tracking, coverage, history, flights, alerts, statistics, sighting log,
+targets, events, attribute budget) on a bare Home Assistant core object with a
+temporary config directory. Only the entity state writes are left out; the
+`homeassistant` package must be installed. Without --url the fake server is
+started in the same process.
+
+Two phases: latency (--duration, no tracing) and then memory (--memory-duration,
+tracemalloc on, baseline taken after the latency phase warmed everything up).
+Every --report seconds a line with percentiles or memory and event counts is
+printed; the summary lists the biggest memory growth (leak detection).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from types import SimpleNamespace
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from homeassistant.const import MATCH_ALL  # noqa: E402
+from homeassistant.core import Event, HomeAssistant, callback  # noqa: E402
+
+from custom_components.air_traffic_merge.const import (  # noqa: E402
+    CONF_AIRCRAFT_DB,
+    CONF_ATTRIBUTE_BUDGET_KB,
+    CONF_ENABLE_TRACKING,
+    CONF_TRACK_CALLSIGNS,
+    CONF_TRACK_MODE,
+    CONF_TRACK_REGISTRATIONS,
+    DOMAIN,
+)
+from custom_components.air_traffic_merge.coverage import Coverage  # noqa: E402
+from custom_components.air_traffic_merge.data import EntryData  # noqa: E402
+from custom_components.air_traffic_merge.pipeline import MergePipeline  # noqa: E402
+from custom_components.air_traffic_merge.sightings import SightingLog  # noqa: E402
+from custom_components.air_traffic_merge.source import AdsbSource, async_get_source  # noqa: E402
+from fake_readsb import STATS_KEY, add_traffic_args, make_app, start_server, traffic_from_args  # noqa: E402
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _percentiles(samples: array) -> str:
+    if len(samples) < 2:
+        return "n/a"
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return f"p50 {q[49] * 1000:.1f} p95 {q[94] * 1000:.1f} p99 {q[98] * 1000:.1f} max {max(samples) * 1000:.1f} ms"
+
+
+def _rss_mb() -> float:
+    # current resident set (ru_maxrss would be the peak); Linux only
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * _PAGE_SIZE / 1e6
+
+
+class Soak:
+    """Polls the source on a fixed schedule and feeds the pipeline."""
+
+    def __init__(self, args: argparse.Namespace, hass: HomeAssistant, source: AdsbSource, pipeline: MergePipeline) -> None:
+        self.args = args
+        self.hass = hass
+        self.source = source
+        self.pipeline = pipeline
+        self.events: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.polls = 0
+        self.flights = 0
+        hass.bus.async_listen(MATCH_ALL, self._count_event)
+
+    @callback
+    def _count_event(self, event: Event) -> None:
+        if not event.event_type.startswith(DOMAIN):
+            return
+        key = event.event_type
+        if "action" in event.data:
+            key = f"{key}:{event.data['action']}"
+        self.events[key] += 1
+
+    async def async_run(self, duration: float, report) -> tuple[array, array]:
+        """Poll for `duration` seconds; (fetch, merge) latencies of the successful polls."""
+        fetch_lat = array("d")
+        merge_lat = array("d")
+        start = time.monotonic()
+        next_report = start + self.args.report
+        next_poll = start
+        window = len(fetch_lat)
+        while (now := time.monotonic()) - start < duration:
+            if now < next_poll:
+                await asyncio.sleep(next_poll - now)
+            # fixed schedule like async_track_time_interval; overruns skip ticks
+            next_poll += self.args.interval * max(1, int((time.monotonic() - next_poll) // self.args.interval) + 1)
+
+            self.polls += 1
+            t0 = time.perf_counter()
+            try:
+                # max_age 0: every poll fetches and decodes, like a single entry on the URL
+                _raw, data = await self.source.async_get(0)
+            except Exception as err:
+                self.errors[type(err).__name__] += 1
+                continue
+            t1 = time.perf_counter()
+            store, _attrs = await self.pipeline.async_process(data)
+            t2 = time.perf_counter()
+            self.flights = len(store["flights"])
+            fetch_lat.append(t1 - t0)
+            merge_lat.append(t2 - t1)
+
+            if time.monotonic() >= next_report:
+                next_report += self.args.report
+                print(
+                    f"[{time.monotonic() - start:7.0f}s] polls {self.polls} errors {sum(self.errors.values())} "
+                    f"flights {self.flights} history {len(self.pipeline.history)} rss {_rss_mb():.0f} MB\n"
+                    f"    {report(fetch_lat[window:], merge_lat[window:])}\n"
+                    f"    events {dict(self.events)}",
+                    flush=True,
+                )
+                window = len(fetch_lat)
+        return fetch_lat, merge_lat
+
+
+def _entry(args: argparse.Namespace) -> SimpleNamespace:
+    tracked = [t.strip().upper() for t in args.tracked.split(",") if t.strip()]
+    return SimpleNamespace(
+        entry_id="soak",
+        data={},
+        options={
+            CONF_ENABLE_TRACKING: bool(tracked),
+            CONF_TRACK_MODE: "both",
+            CONF_TRACK_CALLSIGNS: ",".join(t for t in tracked if "-" not in t),
+            CONF_TRACK_REGISTRATIONS: ",".join(t for t in tracked if "-" in t),
+            CONF_AIRCRAFT_DB: args.aircraft_db,
+            CONF_ATTRIBUTE_BUDGET_KB: args.budget,
+        },
+    )
+
+
+async def _soak(args: argparse.Namespace) -> None:
+    runner = None
+    app = None
+    url = args.url
+    if not url:
+        app = make_app(traffic_from_args(args), args.slow, args.slow_delay, args.fail)
+        runner, url = await start_server(app)
+    print(f"polling {url} every {args.interval}s: {args.duration}s latency, {args.memory_duration}s memory")
+
+    with tempfile.TemporaryDirectory(prefix="air_traffic_soak_") as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config.latitude = args.lat
+        hass.config.longitude = args.lon
+        entry = _entry(args)
+        coverage = Coverage(hass, entry.entry_id)
+        sightings = SightingLog(hass, hass.config.path(DOMAIN, f"sightings_{entry.entry_id}.db"))
+        sightings.async_start()
+        pipeline = MergePipeline(hass, entry, EntryData(sightings=sightings, coverage=coverage))
+        soak = Soak(args, hass, async_get_source(hass, url, entry.entry_id), pipeline)
+
+        growth: Optional[list] = None
+        try:
+            fetch_lat, merge_lat = await soak.async_run(
+                args.duration, lambda f, m: f"fetch {_percentiles(f)}\n    merge {_percentiles(m)}"
+            )
+            if args.memory_duration > 0:
+                # traced separately: tracemalloc slows every allocation down
+                tracemalloc.start(10)
+                gc.collect()
+                baseline = tracemalloc.take_snapshot()
+
+                def _traced(_f: array, _m: array) -> str:
+                    current, peak = tracemalloc.get_traced_memory()
+                    return f"traced {current / 1e6:.1f} MB (peak {peak / 1e6:.1f})"
+
+                await soak.async_run(args.memory_duration, _traced)
+                gc.collect()
+                growth = tracemalloc.take_snapshot().compare_to(baseline, "lineno")
+                tracemalloc.stop()
+        finally:
+            await sightings.async_stop()
+            await coverage.async_flush()
+            await pipeline.async_shutdown()
+            await hass.async_stop(force=True)
+            if runner is not None:
+                await runner.cleanup()
+
+    print("\n=== summary ===")
+    print(f"polls {soak.polls}, errors {dict(soak.errors)}")
+    if app is not None:
+        print(f"server {app[STATS_KEY]}")
+    print(f"fetch {_percentiles(fetch_lat)}")
+    print(f"merge {_percentiles(merge_lat)}")
+    print(f"events {dict(soak.events)}, tracked events fired {pipeline.events.fired}")
+    total = [f + m for f, m in zip(fetch_lat, merge_lat)]
+    over = sum(1 for t in total if t > args.interval)
+    print(f"polls over the interval: {over} of {len(total)}")
+    if growth is not None:
+        print(f"memory growth in the memory phase: {sum(d.size_diff for d in growth) / 1e6:+.2f} MB, top allocations:")
+        for d in growth[: args.top]:
+            print(f"    {d}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="aircraft.json URL (default: start the fake server)")
+    parser.add_argument("--interval", type=float, default=1.0, help="poll interval in seconds")
+    parser.add_argument("--duration", type=float, default=600.0, help="latency phase in seconds")
+    parser.add_argument("--memory-duration", type=float, default=600.0, help="memory phase in seconds (0 = skip)")
+    parser.add_argument("--report", type=float, default=60.0, help="report interval in seconds")
+    parser.add_argument("--top", type=int, default=10, help="allocations listed in the summary")
+    parser.add_argument("--aircraft-db", default="", help="aircraft database option (file path or URL, default off)")
+    parser.add_argument("--budget", type=int, default=0, help="attribute budget in KB (default 0 = off)")
+    add_traffic_args(parser)
+    try:
+        asyncio.run(_soak(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()